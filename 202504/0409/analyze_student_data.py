@@ -8,11 +8,15 @@
 import csv
 import os
 import sys
-import statistics
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
+from grade_stats import summarize
+from student_charts import build_chart_data, render_charts
+from student_table import StudentTable, read_student_table
+
 def read_student_data(filename):
     """
     读取学生成绩文件，将数据存储到字典和DataFrame中
@@ -22,22 +26,15 @@ def read_student_data(filename):
         
     返回:
         tuple: (字典格式的学生数据, DataFrame格式的学生数据)
+            字典格式为 StudentTable，按 {姓名: 成绩} 使用时才生成字典
     """
     if not os.path.exists(filename):
         print(f"错误: 文件 '{filename}' 不存在!")
         return None, None
     
-    student_dict = {}
-    
     try:
-        # 使用pandas读取CSV文件
-        df = pd.read_csv(filename, encoding='utf-8-sig')
-        
-        # 同时创建字典格式
-        for _, row in df.iterrows():
-            student_dict[row['姓名']] = row['成绩']
-        
-        return student_dict, df
+        # 使用pandas读取CSV文件，姓名和成绩保存为数组
+        return read_student_table(filename)
     
     except Exception as e:
         print(f"错误: 读取文件时发生错误: {e}")
@@ -57,24 +54,26 @@ def calculate_statistics(student_dict, df):
     if not student_dict or df is None:
         return None
     
-    grades = list(student_dict.values())
+    if isinstance(student_dict, StudentTable):
+        grades = student_dict.latest_grades
+    else:
+        grades = list(student_dict.values())
     
-    # 基本统计量
+    # 基本统计量和百分位数一次算出
+    summary = summarize(grades, percentiles=(25, 75), at_least=(60,))
     stats = {
-        'count': len(student_dict),
-        'total': sum(grades),
-        'average': statistics.mean(grades),
-        'median': statistics.median(grades),
-        'min': min(grades),
-        'max': max(grades),
-        'std_dev': statistics.stdev(grades) if len(grades) > 1 else 0,
-        'variance': statistics.variance(grades) if len(grades) > 1 else 0
+        'count': summary['count'],
+        'total': summary['total'],
+        'average': summary['mean'],
+        'median': summary['median'],
+        'min': summary['min'],
+        'max': summary['max'],
+        'std_dev': summary['std_dev'],
+        'variance': summary['variance'],
+        'percentile_25': summary['percentiles'][25],
+        'percentile_75': summary['percentiles'][75]
     }
     
-    # 计算百分位数
-    stats['percentile_25'] = statistics.quantiles(grades, n=4)[0]
-    stats['percentile_75'] = statistics.quantiles(grades, n=4)[2]
-    
     # 计算成绩分布
     bins = [0, 60, 70, 80, 90, 100]
     labels = ['不及格', '及格', '良好', '优秀', '满分']
@@ -84,12 +83,11 @@ def calculate_statistics(student_dict, df):
     stats['grade_distribution'] = grade_distribution
     
     # 计算及格率
-    passing_count = sum(1 for grade in grades if grade >= 60)
-    stats['passing_rate'] = passing_count / len(grades) * 100
+    stats['passing_rate'] = summary['at_least'][60] / summary['count'] * 100
     
     return stats
 
-def generate_visualizations(df, stats, output_dir='charts'):
+def generate_visualizations(df, stats, output_dir='charts', parallel=True, workers=None):
     """
     生成可视化图表
     
@@ -97,7 +95,16 @@ def generate_visualizations(df, stats, output_dir='charts'):
         df (DataFrame): 包含学生成绩的DataFrame
         stats (dict): 包含统计信息的字典
         output_dir (str): 图表输出目录
+        parallel (bool): 是否用 Figure API 在进程池中同时渲染各图表
+        workers (int): 并行渲染的进程数，默认按图表数量和 CPU 核数决定
     """
+    if parallel:
+        # 图表共用的数据（成绩直方图、箱线图统计量等）只计算一次
+        chart_data = build_chart_data(df['姓名'], df['成绩'], df['成绩等级'].value_counts())
+        render_charts(chart_data, output_dir, workers=workers)
+        print(f"图表已保存到 '{output_dir}' 目录")
+        return
+    
     # 创建输出目录
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
@@ -244,24 +251,32 @@ def display_results(filename):
     for grade, count in stats['grade_distribution'].items():
         print(f"{grade}: {count}人 ({count/stats['count']*100:.1f}%)")
     
-    # 显示所有学生成绩
+    # 每行的成绩等级（pd.cut 的分类编码）已经算好，按行号取出，不再逐个学生筛选 DataFrame
+    level_column = df['成绩等级']
+    level_labels = np.array(list(level_column.cat.categories) + [np.nan], dtype=object)
+    row_levels = level_labels[level_column.cat.codes.to_numpy()]
+    
+    # 显示所有学生成绩（字典顺序，重名取最后一行）
     print("\n学生成绩列表:")
     print("姓名\t成绩\t成绩等级\t与平均分的差距")
     print("-" * 50)
-    for name, grade in student_dict.items():
-        grade_level = df[df['姓名'] == name]['成绩等级'].values[0]
+    positions = student_dict.unique_positions
+    for name, grade, grade_level in zip(student_dict.names[positions].tolist(),
+                                        student_dict.grades[positions].tolist(),
+                                        row_levels[positions].tolist()):
         diff = grade - stats['average']
         diff_str = f"+{diff:.2f}" if diff > 0 else f"{diff:.2f}"
         print(f"{name}\t{grade}\t{grade_level}\t{diff_str}")
     
-    # 按成绩排序
-    sorted_students = sorted(student_dict.items(), key=lambda x: x[1], reverse=True)
+    # 按成绩排序，使用排名索引
+    ranking = student_dict.ranking
     
     print("\n成绩排名:")
     print("排名\t姓名\t成绩\t成绩等级")
     print("-" * 30)
-    for i, (name, grade) in enumerate(sorted_students, 1):
-        grade_level = df[df['姓名'] == name]['成绩等级'].values[0]
+    for i, (name, grade, grade_level) in enumerate(zip(student_dict.names[ranking].tolist(),
+                                                        student_dict.grades[ranking].tolist(),
+                                                        row_levels[ranking].tolist()), 1):
         print(f"{i}\t{name}\t{grade}\t{grade_level}")
     
     # 生成可视化图表
@@ -3,13 +3,17 @@
 
 """
 这个脚本读取学生成绩CSV文件，计算统计信息并显示结果。
+
+文件太大时使用 --stream：分块读取并累计统计，内存占用固定，只输出统计信息，不列出每名学生。
 """
 
+import argparse
 import csv
 import os
-import sys
 import statistics
 
+from grade_stats import summarize_csv
+
 def analyze_student_grades(filename):
     """
     读取学生成绩CSV文件，计算统计信息
@@ -64,14 +68,57 @@ def analyze_student_grades(filename):
         print(f"错误: 读取文件时发生错误: {e}")
         return None
 
-def display_results(filename):
+def analyze_student_grades_streaming(filename, chunk_size=100000):
+    """
+    分块读取学生成绩CSV文件并计算统计信息，内存占用与文件大小无关
+
+    整数成绩的结果与 analyze_student_grades 相同，但不包含 'students' 名单
+
+    参数:
+        filename (str): 包含学生成绩的CSV文件名
+        chunk_size (int): 每次读取的行数
+
+    返回:
+        dict: 包含统计信息的字典
+    """
+    if not os.path.exists(filename):
+        print(f"错误: 文件 '{filename}' 不存在!")
+        return None
+
+    try:
+        summary = summarize_csv(filename, chunk_size=chunk_size, integer_only=True, percentiles=(), at_least=())
+        if summary['count'] == 0:
+            raise statistics.StatisticsError('mean requires at least one data point')
+
+        return {
+            'count': summary['count'],
+            'total': summary['total'],
+            'average': summary['mean'],
+            'median': summary['median'],
+            'min': summary['min'],
+            'max': summary['max']
+        }
+
+    except ValueError as e:
+        print(f"错误: 文件包含非数字成绩: {e}")
+        return None
+    except Exception as e:
+        print(f"错误: 读取文件时发生错误: {e}")
+        return None
+
+def display_results(filename, stream=False, chunk_size=100000):
     """
     显示分析结果
     
     参数:
         filename (str): 包含学生成绩的CSV文件名
+        stream (bool): 是否分块读取，只显示统计信息
+        chunk_size (int): 分块读取时每块的行数
     """
-    stats = analyze_student_grades(filename)
+    if stream:
+        stats = analyze_student_grades_streaming(filename, chunk_size)
+    else:
+        stats = analyze_student_grades(filename)
     
     if stats is None:
         return
@@ -84,6 +131,9 @@ def display_results(filename):
     print(f"最低成绩: {stats['min']}")
     print(f"最高成绩: {stats['max']}")
     
+    if stream:
+        return
+    
     # 显示所有学生成绩
     print("\n学生成绩列表:")
     print("姓名\t成绩")
@@ -101,11 +151,10 @@ def display_results(filename):
         print(f"{i}\t{student['name']}\t{student['grade']}")
 
 if __name__ == "__main__":
-    # 默认文件名
-    filename = "student_grades.csv"
-    
-    # 如果提供了命令行参数，使用它作为文件名
-    if len(sys.argv) > 1:
-        filename = sys.argv[1]
+    parser = argparse.ArgumentParser(description='学生成绩分析')
+    parser.add_argument('filename', nargs='?', default='student_grades.csv', help='学生成绩CSV文件')
+    parser.add_argument('--stream', action='store_true', help='分块读取大文件，只显示统计信息')
+    parser.add_argument('--chunk-size', type=int, default=100000, help='分块读取时每块的行数')
+    args = parser.parse_args()
     
-    display_results(filename) 
\ No newline at end of file
+    display_results(args.filename, args.stream, args.chunk_size) 
\ No newline at end of file
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+比较各 Excel 写入后端写出 sales_汇总.xlsx（分析结果 + 原始数据）的耗时和内存峰值。
+
+用法:
+    python benchmark_excel_writer.py --rows 100000 1000000
+
+每个后端在单独的子进程中运行，内存峰值取子进程的最大常驻内存（ru_maxrss）。
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from sales_excel_writer import BACKENDS
+
+
+def build_raw_data(rows, seed=0):
+    """生成与 load_excel_file 输出结构相同的原始数据"""
+    rng = np.random.default_rng(seed)
+    categories = np.array(['电子产品', '服装', '食品', '家居用品', '化妆品', '运动器材', '图书', '玩具'])
+    cities = np.array(['北京', '上海', '广州', '深圳', '杭州'])
+    city = cities[rng.integers(0, len(cities), rows)]
+    return pd.DataFrame({
+        '日期': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D'),
+        '产品类别': categories[rng.integers(0, len(categories), rows)],
+        '销售额': rng.integers(1000, 10000, rows),
+        '城市': city,
+        '来源文件': np.char.add(np.char.add('sales_', city), '.xlsx'),
+    })
+
+
+def _run_backend(name, rows, output_path, queue):
+    # resource 只在 Linux / macOS 上可用，main 中已检查平台
+    import resource
+
+    raw = build_raw_data(rows)
+    pivot = raw.pivot_table(index='产品类别', columns='城市', values='销售额', aggfunc='sum').reset_index()
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    BACKENDS[name](output_path, {'分析结果': pivot, '原始数据': raw})
+    elapsed = time.perf_counter() - start
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((elapsed, (peak_rss - base_rss) / 1024, os.path.getsize(output_path) / 1024 / 1024))
+
+
+def benchmark(rows, backends):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name in backends:
+            queue = multiprocessing.Queue()
+            output_path = os.path.join(tmp_dir, f'{name}.xlsx')
+            process = multiprocessing.Process(target=_run_backend, args=(name, rows, output_path, queue))
+            process.start()
+            process.join()
+            if process.exitcode != 0:
+                print(f"{name:<12} 运行失败（退出码 {process.exitcode}）")
+                continue
+            elapsed, extra_mb, size_mb = queue.get()
+            results[name] = elapsed
+            print(f"{name:<12} {elapsed:8.1f} 秒   写入期间内存增加 {extra_mb:8.1f} MB   文件 {size_mb:6.1f} MB")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Excel 写入后端基准测试')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000], help='原始数据行数')
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=list(BACKENDS))
+    args = parser.parse_args()
+
+    if sys.platform == 'win32':
+        print("Windows 不支持 resource 模块，请在 Linux / macOS 上运行")
+        return
+
+    for rows in args.rows:
+        print(f"\n原始数据 {rows} 行：")
+        results = benchmark(rows, args.backends)
+        if 'pandas' in results:
+            for name, elapsed in results.items():
+                print(f"{name:<12} 相对 pandas 加速 {results['pandas'] / elapsed:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
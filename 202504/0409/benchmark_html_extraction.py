@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+比较各标题解析后端处理京东商品页面的 CPU 耗时。
+
+用法:
+    python benchmark_html_extraction.py [保存的商品页面目录] [--repeat 5]
+
+目录中的 *.html 文件作为测试页面（可用浏览器“另存为”保存商品页）；
+未提供目录时生成一个约 300 KB 的模拟页面。
+"""
+
+import argparse
+import glob
+import os
+import time
+
+from jd_html_extract import BACKENDS, extract_title_bs4
+
+
+def build_synthetic_page(size_kb=300):
+    """生成结构接近京东商品页的模拟页面，.sku-name 位于页面中部"""
+    filler = '<div class="item"><a href="#">推荐商品</a><span class="p-price">¥99.00</span></div>\n'
+    half = filler * (size_kb * 1024 // len(filler.encode('utf-8')) // 2)
+    return (
+        '<html><head><title>京东</title><script>var pageConfig = {};</script></head><body>'
+        f'{half}'
+        '<div class="itemInfo-wrap"><div class="sku-name">\n'
+        '  <img src="logo.png" alt=""> Apple iPhone 15 (A3092) 128GB 黑色 支持移动联通电信5G 双卡双待手机\n'
+        '</div></div>'
+        f'{half}</body></html>'
+    )
+
+
+def load_pages(fixture_dir):
+    pages = {}
+    if fixture_dir:
+        for path in sorted(glob.glob(os.path.join(fixture_dir, '*.html'))):
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                pages[os.path.basename(path)] = f.read()
+    if not pages:
+        pages['synthetic.html'] = build_synthetic_page()
+    return pages
+
+
+def benchmark(pages, repeat=5):
+    results = {}
+    for name, extractor in BACKENDS.items():
+        try:
+            extractor(next(iter(pages.values())))
+        except ImportError:
+            print(f"{name:<12} 未安装，跳过")
+            continue
+
+        mismatches = 0
+        start = time.process_time()
+        for _ in range(repeat):
+            for html in pages.values():
+                extractor(html)
+        elapsed = time.process_time() - start
+
+        for html in pages.values():
+            if extractor(html) != extract_title_bs4(html):
+                mismatches += 1
+
+        per_page_ms = elapsed / (repeat * len(pages)) * 1000
+        results[name] = per_page_ms
+        print(f"{name:<12} {per_page_ms:8.2f} ms/页   与 bs4 结果不一致: {mismatches}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='标题解析后端基准测试')
+    parser.add_argument('fixture_dir', nargs='?', help='保存的商品页面目录')
+    parser.add_argument('--repeat', type=int, default=5, help='每个页面重复解析次数')
+    args = parser.parse_args()
+
+    pages = load_pages(args.fixture_dir)
+    total_kb = sum(len(html.encode('utf-8')) for html in pages.values()) / 1024
+    print(f"测试页面 {len(pages)} 个，共 {total_kb:.0f} KB，每页重复 {args.repeat} 次\n")
+
+    results = benchmark(pages, args.repeat)
+    if 'bs4' in results:
+        print()
+        for name, ms in results.items():
+            print(f"{name:<12} 相对 bs4 加速 {results['bs4'] / ms:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
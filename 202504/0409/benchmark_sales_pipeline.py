@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+销售数据流程的端到端基准测试。
+
+按不同数据规模生成城市销售文件，然后依次计时流程的各个阶段：
+生成(generate) → 读取(read) → 验证(validate) → 合并(concat) → 透视(pivot) →
+写出Excel(excel_write) → 生成HTML报表(html_render)，并记录每个阶段结束时的进程内存峰值。
+结果保存为 JSON，可用 --baseline 与上一版本的结果对比，发现性能回退。
+
+用法:
+    python benchmark_sales_pipeline.py --rows 10000 100000 1000000 --output sales_benchmark.json
+    python benchmark_sales_pipeline.py --rows 100000 --baseline sales_benchmark.json
+
+每个规模在单独的子进程中运行，内存峰值互不影响。
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CITIES = ['北京', '上海', '广州', '深圳']
+STAGES = ['generate', 'read', 'validate', 'concat', 'pivot', 'excel_write', 'html_render']
+
+
+def peak_rss_mb():
+    """当前进程的最大常驻内存（MB）"""
+    # resource 只在 Linux / macOS 上可用，main 中已检查平台
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+class StageTimer:
+    """记录各阶段耗时和阶段结束时的内存峰值"""
+
+    def __init__(self):
+        self.stages = {}
+
+    def run(self, name, func, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.stages[name] = {
+            'seconds': round(time.perf_counter() - start, 4),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        }
+        return result
+
+
+def _run_scale(rows, cities, num_products, writer, seed, queue):
+    """子进程入口：在临时目录中跑完整个流程"""
+    from generate_sales_data import write_city_files
+    from process_sales_data import _clean_sales_data, aggregate_daily, build_pivot, build_rollups
+    from sales_excel_writer import write_sheets
+    from sales_report_mailer import create_html_table
+
+    num_days = max(1, rows // (len(cities) * num_products))
+    timer = StageTimer()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        paths = timer.run('generate', write_city_files, cities, num_products, num_days,
+                          output_dir=work_dir, chunk_days=1000, seed=seed)
+
+        raw_frames = timer.run('read', lambda: [pd.read_excel(path) for path in paths])
+        frames = timer.run('validate', lambda: [_clean_sales_data(df, path)[0]
+                                                for df, path in zip(raw_frames, paths)])
+        del raw_frames
+        combined_data = timer.run('concat', pd.concat, frames, ignore_index=True)
+        del frames
+
+        def pivot():
+            daily_data = aggregate_daily(combined_data)
+            return build_pivot(daily_data), build_rollups(daily_data)
+
+        pivot_data, rollups = timer.run('pivot', pivot)
+        timer.run('excel_write', write_sheets, os.path.join(work_dir, 'sales_汇总.xlsx'),
+                  {'分析结果': pivot_data, **rollups, '原始数据': combined_data}, engine=writer)
+        html = timer.run('html_render', create_html_table, pivot_data)
+
+    queue.put({
+        'rows': len(combined_data),
+        'cities': len(cities),
+        'products': num_products,
+        'days': num_days,
+        'html_bytes': len(html.encode('utf-8')),
+        'total_seconds': round(sum(stage['seconds'] for stage in timer.stages.values()), 4),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'stages': timer.stages,
+    })
+
+
+def run_scale(rows, cities, num_products, writer, seed):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run_scale, args=(rows, cities, num_products, writer, seed, queue))
+    process.start()
+    process.join()
+    if process.exitcode != 0:
+        print(f"{rows} 行的测试运行失败（退出码 {process.exitcode}）")
+        return None
+    return queue.get()
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_result(result, baseline=None):
+    print(f"\n{result['rows']} 行（{result['cities']} 城市 × {result['products']} 类别 × {result['days']} 天），"
+          f"总耗时 {result['total_seconds']:.2f} 秒，内存峰值 {result['peak_rss_mb']:.0f} MB")
+    for name in STAGES:
+        stage = result['stages'][name]
+        line = f"  {name:<12} {stage['seconds']:9.3f} 秒   内存峰值 {stage['peak_rss_mb']:8.1f} MB"
+        if baseline and name in baseline['stages'] and baseline['stages'][name]['seconds'] > 0:
+            ratio = stage['seconds'] / baseline['stages'][name]['seconds']
+            line += f"   相对基准 {ratio:5.2f}x" + ('  ⚠️ 变慢' if ratio > 1.2 else '')
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='销售数据流程基准测试')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000], help='总行数（各城市合计）')
+    parser.add_argument('--cities', nargs='+', default=DEFAULT_CITIES, help='城市列表（需包含北京、上海）')
+    parser.add_argument('--products', type=int, default=10, help='每个城市的产品类别数')
+    parser.add_argument('--writer', default='xlsxwriter', help='Excel写入后端')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--output', default='sales_benchmark.json', help='结果 JSON 文件')
+    parser.add_argument('--baseline', help='用于对比的历史结果 JSON 文件')
+    args = parser.parse_args()
+
+    if sys.platform == 'win32':
+        print("Windows 不支持 resource 模块，请在 Linux / macOS 上运行")
+        return
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = {item['rows']: item for item in json.load(f)['results']}
+
+    results = []
+    for rows in args.rows:
+        result = run_scale(rows, args.cities, args.products, args.writer, args.seed)
+        if result is not None:
+            print_result(result, baseline.get(result['rows']))
+            results.append(result)
+
+    report = {
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'versions': {'pandas': pd.__version__, 'numpy': np.__version__},
+        'writer': args.writer,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(f"\n结果已保存至 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+比较前 N 名和按等级查询学生的三种方式：
+
+    sorted      每次调用都对整个字典排序 / 逐个扫描学生（原来的做法）
+    partition   不建索引，np.partition 只排序候选者 / 按等级取下标数组
+    indexed     build_indexes() 之后直接从排名和等级索引中取 k 条
+
+用法:
+    python benchmark_student_queries.py --students 1000000 --repeat 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from student_table import GRADE_LEVELS, StudentTable
+
+
+def build_table(num_students, seed=0):
+    rng = np.random.default_rng(seed)
+    names = np.char.add('学生', np.arange(num_students).astype(str)).astype(object)
+    return StudentTable(names, rng.integers(0, 101, num_students))
+
+
+def sorted_top(students_dict, n):
+    ranked = sorted(students_dict.items(), key=lambda x: x[1], reverse=True)
+    return [{'姓名': name, '成绩': grade, '排名': i + 1} for i, (name, grade) in enumerate(ranked[:n])]
+
+
+def scan_level(students_dict, level):
+    min_grade, max_grade = GRADE_LEVELS[level]
+    return [{'姓名': name, '成绩': grade} for name, grade in students_dict.items()
+            if min_grade <= grade <= max_grade]
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='学生查询索引基准测试')
+    parser.add_argument('--students', type=int, default=1000000, help='学生人数')
+    parser.add_argument('--top', type=int, default=10, help='前 N 名')
+    parser.add_argument('--level', default='优秀', choices=list(GRADE_LEVELS), help='查询的等级')
+    parser.add_argument('--repeat', type=int, default=20, help='每种方式重复查询的次数')
+    args = parser.parse_args()
+
+    table = build_table(args.students)
+    students_dict = table.students_dict
+
+    print(f"{args.students} 名学生，前 {args.top} 名 / 等级“{args.level}”，每次查询的平均耗时：")
+
+    sorted_seconds, expected_top = timed(lambda: sorted_top(students_dict, args.top), args.repeat)
+    partition_seconds, top = timed(lambda: table.top(args.top), args.repeat)
+    assert top == expected_top
+
+    start = time.perf_counter()
+    table.build_indexes()
+    build_seconds = time.perf_counter() - start
+    indexed_seconds, top = timed(lambda: table.top(args.top), args.repeat)
+    assert top == expected_top
+
+    print(f"  前 {args.top} 名  sorted    {sorted_seconds * 1000:10.3f} ms")
+    print(f"  前 {args.top} 名  partition {partition_seconds * 1000:10.3f} ms")
+    print(f"  前 {args.top} 名  indexed   {indexed_seconds * 1000:10.3f} ms"
+          f"   相对 sorted 加速 {sorted_seconds / indexed_seconds:8.0f}x")
+
+    scan_seconds, expected_level = timed(lambda: scan_level(students_dict, args.level), args.repeat)
+    indexed_level_seconds, level = timed(lambda: table.students_in_level(args.level), args.repeat)
+    assert level == expected_level
+
+    print(f"  等级查询 scan      {scan_seconds * 1000:10.3f} ms   （{len(level)} 人）")
+    print(f"  等级查询 indexed   {indexed_level_seconds * 1000:10.3f} ms"
+          f"   相对 scan 加速 {scan_seconds / indexed_level_seconds:8.1f}x")
+    print(f"  建立索引（一次）   {build_seconds * 1000:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
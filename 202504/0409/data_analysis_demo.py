@@ -7,15 +7,19 @@
 """
 
 import os
+import sys
 import csv
 import json
-import statistics
 import collections
 from datetime import datetime
 import pandas as pd
 import matplotlib.pyplot as plt
 from typing import Dict, List, Tuple, Any, Optional
 
+from grade_stats import summarize
+from student_charts import build_chart_data, render_charts
+from student_table import GRADE_LEVELS, StudentTable
+
 class StudentDataAnalyzer:
     """学生数据分析器类，用于处理和分析学生成绩数据"""
     
@@ -27,19 +31,26 @@ class StudentDataAnalyzer:
             filename (str): 包含学生成绩的CSV文件名
         """
         self.filename = filename
-        self.students_dict = {}  # 字典格式: {学生姓名: 成绩}
-        self.students_list = []  # 列表格式: [{'姓名': 姓名, '成绩': 成绩}, ...]
-        self.grades_by_level = collections.defaultdict(list)  # 按成绩等级分组
+        self.table = None  # 列式存储的学生数据（StudentTable）
         self.df = None  # pandas DataFrame格式
         
         # 成绩等级定义
-        self.grade_levels = {
-            '优秀': (90, 100),
-            '良好': (80, 89),
-            '中等': (70, 79),
-            '及格': (60, 69),
-            '不及格': (0, 59)
-        }
+        self.grade_levels = dict(GRADE_LEVELS)
+    
+    @property
+    def students_dict(self) -> Dict[str, Any]:
+        """字典格式: {学生姓名: 成绩}，第一次访问时生成"""
+        return self.table.students_dict if self.table is not None else {}
+    
+    @property
+    def students_list(self) -> List[Dict[str, Any]]:
+        """列表格式: [{'姓名': 姓名, '成绩': 成绩}, ...]，第一次访问时生成"""
+        return self.table.students_list if self.table is not None else []
+    
+    @property
+    def grades_by_level(self) -> Dict[str, List[str]]:
+        """按成绩等级分组的学生姓名，第一次访问时生成"""
+        return self.table.grades_by_level if self.table is not None else collections.defaultdict(list)
     
     def load_data(self) -> bool:
         """
@@ -56,23 +67,14 @@ class StudentDataAnalyzer:
             # 1. 使用pandas读取CSV文件
             self.df = pd.read_csv(self.filename, encoding='utf-8-sig')
             
-            # 2. 将数据加载到字典中
-            for _, row in self.df.iterrows():
-                name = row['姓名']
-                grade = row['成绩']
-                self.students_dict[name] = grade
-                
-                # 3. 将数据加载到列表中
-                self.students_list.append({
-                    '姓名': name,
-                    '成绩': grade
-                })
-                
-                # 4. 按成绩等级分组
-                level = self._get_grade_level(grade)
-                self.grades_by_level[level].append(name)
+            # 2. 保存为姓名、成绩两个数组，成绩等级一次性计算；
+            #    字典、列表和按等级分组的名单在第一次使用时才生成
+            self.table = StudentTable.from_frame(self.df, self.grade_levels)
+            
+            # 3. 建立排名和等级索引，前 N 名和按等级查询可以反复调用
+            self.table.build_indexes()
             
-            print(f"成功加载了 {len(self.students_dict)} 名学生的数据")
+            print(f"成功加载了 {len(self.table.names)} 名学生的数据")
             return True
             
         except Exception as e:
@@ -101,30 +103,30 @@ class StudentDataAnalyzer:
         返回:
             Dict[str, Any]: 包含统计信息的字典
         """
-        if not self.students_dict:
+        if not self.table:
             return {}
         
-        grades = list(self.students_dict.values())
+        # 基本统计量、百分位数和及格人数一次算出（重名学生与字典一致，只计最后一条）
+        summary = summarize(self.table.latest_grades, percentiles=(25, 75), at_least=(60,))
         
         stats = {
-            'count': len(self.students_dict),
-            'total': sum(grades),
-            'average': statistics.mean(grades),
-            'median': statistics.median(grades),
-            'min': min(grades),
-            'max': max(grades),
-            'std_dev': statistics.stdev(grades) if len(grades) > 1 else 0,
-            'variance': statistics.variance(grades) if len(grades) > 1 else 0
+            'count': summary['count'],
+            'total': summary['total'],
+            'average': summary['mean'],
+            'median': summary['median'],
+            'min': summary['min'],
+            'max': summary['max'],
+            'std_dev': summary['std_dev'],
+            'variance': summary['variance']
         }
         
         # 计算百分位数
-        if len(grades) >= 4:
-            stats['percentile_25'] = statistics.quantiles(grades, n=4)[0]
-            stats['percentile_75'] = statistics.quantiles(grades, n=4)[2]
+        if summary['count'] >= 4:
+            stats['percentile_25'] = summary['percentiles'][25]
+            stats['percentile_75'] = summary['percentiles'][75]
         
         # 计算及格率
-        passing_count = sum(1 for grade in grades if grade >= 60)
-        stats['passing_rate'] = passing_count / len(grades) * 100
+        stats['passing_rate'] = summary['at_least'][60] / summary['count'] * 100
         
         return stats
     
@@ -138,15 +140,11 @@ class StudentDataAnalyzer:
         返回:
             List[Dict[str, Any]]: 包含学生信息的列表
         """
-        if not self.students_dict:
+        if not self.table:
             return []
         
-        # 按成绩排序
-        sorted_students = sorted(self.students_dict.items(), key=lambda x: x[1], reverse=True)
-        
-        # 返回前n名
-        return [{'姓名': name, '成绩': grade, '排名': i+1} 
-                for i, (name, grade) in enumerate(sorted_students[:n])]
+        # 直接从排名索引中取前n名
+        return self.table.top(n)
     
     def find_students_by_level(self, level: str) -> List[Dict[str, Any]]:
         """
@@ -158,11 +156,10 @@ class StudentDataAnalyzer:
         返回:
             List[Dict[str, Any]]: 包含学生信息的列表
         """
-        if level not in self.grades_by_level:
+        if self.table is None:
             return []
         
-        students = self.grades_by_level[level]
-        return [{'姓名': name, '成绩': self.students_dict[name]} for name in students]
+        return self.table.students_in_level(level)
     
     def generate_grade_distribution(self) -> Dict[str, int]:
         """
@@ -171,10 +168,9 @@ class StudentDataAnalyzer:
         返回:
             Dict[str, int]: 各等级的学生人数
         """
-        distribution = {}
-        for level in self.grade_levels.keys():
-            distribution[level] = len(self.grades_by_level[level])
-        return distribution
+        if self.table is None:
+            return {level: 0 for level in self.grade_levels}
+        return self.table.level_counts()
     
     def export_to_json(self, output_file: str = 'student_analysis.json') -> bool:
         """
@@ -190,7 +186,7 @@ class StudentDataAnalyzer:
             # 收集所有分析结果
             results = {
                 '基本信息': {
-                    '学生总数': len(self.students_dict),
+                    '学生总数': len(self.table) if self.table is not None else 0,
                     '分析时间': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 },
                 '统计信息': self.calculate_basic_stats(),
@@ -228,7 +224,7 @@ class StudentDataAnalyzer:
             # 添加排名和等级列
             result_df = self.df.copy()
             result_df['排名'] = result_df['成绩'].rank(ascending=False, method='min').astype(int)
-            result_df['成绩等级'] = result_df['成绩'].apply(self._get_grade_level)
+            result_df['成绩等级'] = self.table.levels
             
             # 按排名排序
             result_df = result_df.sort_values('排名')
@@ -243,12 +239,15 @@ class StudentDataAnalyzer:
             print(f"错误: 导出CSV文件时发生错误: {e}")
             return False
     
-    def generate_charts(self, output_dir: str = 'charts') -> bool:
+    def generate_charts(self, output_dir: str = 'charts', parallel: bool = True,
+                        workers: Optional[int] = None) -> bool:
         """
         生成可视化图表
         
         参数:
             output_dir (str): 图表输出目录
+            parallel (bool): 是否用 Figure API 在进程池中同时渲染各图表
+            workers (Optional[int]): 并行渲染的进程数，默认按图表数量和 CPU 核数决定
             
         返回:
             bool: 生成是否成功
@@ -257,6 +256,16 @@ class StudentDataAnalyzer:
             return False
         
         try:
+            if parallel:
+                # 图表共用的数据（成绩直方图、等级人数等）只计算一次
+                chart_data = build_chart_data(self.df['姓名'], self.df['成绩'],
+                                              pd.Series(self.table.levels).value_counts())
+                render_charts(chart_data, output_dir,
+                              charts=['成绩分布直方图.png', '成绩等级分布.png', '学生成绩条形图.png'],
+                              workers=workers)
+                print(f"图表已保存到 '{output_dir}' 目录")
+                return True
+            
             # 创建输出目录
             if not os.path.exists(output_dir):
                 os.makedirs(output_dir)
@@ -277,7 +286,7 @@ class StudentDataAnalyzer:
             
             # 2. 成绩等级饼图
             plt.figure(figsize=(10, 8))
-            grade_counts = self.df['成绩'].apply(self._get_grade_level).value_counts()
+            grade_counts = pd.Series(self.table.levels).value_counts()
             plt.pie(grade_counts, labels=grade_counts.index, autopct='%1.1f%%', 
                     startangle=90, shadow=True, explode=[0.05] * len(grade_counts))
             plt.title('学生成绩等级分布')
@@ -314,7 +323,7 @@ class StudentDataAnalyzer:
     
     def display_summary(self) -> None:
         """显示分析摘要"""
-        if not self.students_dict:
+        if not self.table:
             print("没有数据可供分析")
             return
         
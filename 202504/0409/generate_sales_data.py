@@ -1,55 +1,118 @@
+import argparse
+import os
+
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
-def generate_sales_data(city, num_products=5, num_days=30):
-    """生成销售数据"""
-    # 产品类别
-    product_categories = [
-        '电子产品', '服装', '食品', '家居用品', '化妆品',
-        '运动器材', '图书', '玩具', '办公用品', '珠宝首饰'
-    ]
-    
-    # 随机选择产品类别
-    selected_categories = np.random.choice(product_categories, num_products, replace=False)
-    
+# 产品类别
+PRODUCT_CATEGORIES = [
+    '电子产品', '服装', '食品', '家居用品', '化妆品',
+    '运动器材', '图书', '玩具', '办公用品', '珠宝首饰'
+]
+
+def _select_categories(num_products, rng):
+    """随机选择产品类别，数量超过预置类别时补充编号类别"""
+    categories = PRODUCT_CATEGORIES
+    if num_products > len(categories):
+        categories = categories + [f'产品类别{i}' for i in range(len(categories) + 1, num_products + 1)]
+    return rng.choice(categories, num_products, replace=False)
+
+def iter_sales_chunks(num_products=5, num_days=30, chunk_days=None, end_date=None, rng=None):
+    """
+    按日期分块生成销售数据
+
+    每块包含 chunk_days 天 × num_products 个类别，用数组广播一次生成，不逐行构造。
+    随机数按日期、类别的顺序抽取，同一随机种子下结果与分块大小无关
+
+    参数:
+        num_products (int): 产品类别数
+        num_days (int): 天数
+        chunk_days (int): 每块的天数，None 表示一次生成全部
+        end_date (datetime): 最后一天，默认为当前时间
+        rng (RandomState): 随机数生成器，默认为 np.random 模块（受 np.random.seed 控制）
+
+    返回:
+        generator: 逐块产生包含 日期 / 产品类别 / 销售额 的 DataFrame
+    """
+    # np.random 模块本身提供 choice / randint，使用全局生成器
+    rng = rng if rng is not None else np.random
+
+    # 随机选择产品类别；销售额按选中顺序抽取，输出时每天内按类别排序
+    selected_categories = _select_categories(num_products, rng)
+    order = np.argsort(selected_categories, kind='stable')
+    selected_categories = selected_categories[order]
+
     # 生成日期范围
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=num_days-1)
+    end_date = end_date or datetime.now()
+    start_date = end_date - timedelta(days=num_days - 1)
     dates = pd.date_range(start=start_date, end=end_date, freq='D')
-    
-    # 生成销售数据
-    data = []
-    for date in dates:
-        for category in selected_categories:
-            # 生成随机销售额（1000-10000之间）
-            sales = np.random.randint(1000, 10000)
-            data.append({
-                '日期': date,
-                '产品类别': category,
-                '销售额': sales
-            })
-    
-    # 创建DataFrame
-    df = pd.DataFrame(data)
-    
-    # 按日期和产品类别排序
-    df = df.sort_values(['日期', '产品类别'])
-    
-    return df
+
+    chunk_days = chunk_days or len(dates)
+    for start in range(0, len(dates), chunk_days):
+        chunk_dates = dates[start:start + chunk_days]
+        # 生成随机销售额（1000-10000之间），形状为 (天数, 类别数)
+        sales = rng.randint(1000, 10000, size=(len(chunk_dates), num_products))[:, order]
+        yield pd.DataFrame({
+            '日期': np.repeat(chunk_dates.values, num_products),
+            '产品类别': np.tile(selected_categories, len(chunk_dates)),
+            '销售额': sales.ravel()
+        })
+
+def generate_sales_data(city, num_products=5, num_days=30, rng=None):
+    """生成销售数据"""
+    return next(iter_sales_chunks(num_products, num_days, rng=rng))
+
+def write_city_files(cities, num_products=5, num_days=30, output_dir='.', chunk_days=None, seed=None):
+    """
+    为每个城市生成 sales_城市.xlsx
+
+    chunk_days 不为 None 时逐块生成并写入，内存占用只与块大小有关，适合生成几百万行的压测数据
+
+    返回:
+        list: 生成的文件路径
+    """
+    from sales_excel_writer import write_sheets
+
+    if seed is not None:
+        np.random.seed(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    end_date = datetime.now()
+
+    paths = []
+    for city in cities:
+        path = os.path.join(output_dir, f'sales_{city}.xlsx')
+        chunks = iter_sales_chunks(num_products, num_days, chunk_days, end_date)
+        write_sheets(path, {'Sheet1': chunks}, engine='xlsxwriter')
+        print(f"已生成{city}销售数据：{path}（{num_products * num_days} 行）")
+        paths.append(path)
+    return paths
 
 def main():
+    parser = argparse.ArgumentParser(description='生成模拟销售数据')
+    parser.add_argument('--cities', nargs='+', help='城市列表，不指定时生成北京、上海两个示例文件')
+    parser.add_argument('--products', type=int, default=5, help='每个城市的产品类别数')
+    parser.add_argument('--days', type=int, default=30, help='天数')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--output-dir', default='.', help='输出目录')
+    parser.add_argument('--chunk-days', type=int, default=None, help='分块生成并写入，每块的天数')
+    args = parser.parse_args()
+
+    if args.cities:
+        write_city_files(args.cities, args.products, args.days, args.output_dir, args.chunk_days, args.seed)
+        return
+
     # 设置随机种子以确保可重复性
-    np.random.seed(42)
+    np.random.seed(args.seed)
     
     # 生成北京销售数据
-    beijing_data = generate_sales_data('北京')
-    beijing_data.to_excel('sales_北京.xlsx', index=False)
+    beijing_data = generate_sales_data('北京', args.products, args.days)
+    beijing_data.to_excel(os.path.join(args.output_dir, 'sales_北京.xlsx'), index=False)
     print("已生成北京销售数据：sales_北京.xlsx")
     
     # 生成上海销售数据
-    shanghai_data = generate_sales_data('上海')
-    shanghai_data.to_excel('sales_上海.xlsx', index=False)
+    shanghai_data = generate_sales_data('上海', args.products, args.days)
+    shanghai_data.to_excel(os.path.join(args.output_dir, 'sales_上海.xlsx'), index=False)
     print("已生成上海销售数据：sales_上海.xlsx")
     
     # 显示数据示例
@@ -59,4 +122,4 @@ def main():
     print(shanghai_data.head())
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
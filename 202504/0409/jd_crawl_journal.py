@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+爬取日志与增量输出。
+
+每爬完一个商品就先把结果以 JSON Lines 形式追加到日志文件并刷新到磁盘，再写入 CSV。
+日志文件本身就是断点：续爬时读取其中已完成的 SKU 并跳过，不会重复请求，也不会在 CSV 中写入重复行。
+崩溃可能发生在写完日志、CSV 行还没写完的时候，续爬时检查 CSV 末尾，补写日志中最后一条记录的行。
+最终的 JSON 数组文件由日志流式导出，内存占用与商品数量无关。
+"""
+
+import csv
+import io
+import json
+import os
+
+
+class CrawlJournal:
+    """以 JSON Lines 记录已完成商品的爬取日志，支持断点续爬"""
+
+    def __init__(self, journal_path, output_csv, fieldnames, resume=False):
+        """
+        初始化爬取日志
+
+        参数:
+            journal_path (str): JSON Lines 日志文件路径
+            output_csv (str): CSV 输出文件路径（追加写入）
+            fieldnames (list): CSV 字段
+            resume (bool): 是否从已有日志续爬；为 False 时清空日志重新开始
+        """
+        self.journal_path = journal_path
+        self.output_csv = output_csv
+        self.done = set()
+
+        last_record = None
+        if resume and os.path.exists(journal_path):
+            last_record = self._load()
+        else:
+            open(journal_path, 'w', encoding='utf-8').close()
+
+        csv_exists = os.path.isfile(output_csv)
+        missing_row = csv_exists and last_record is not None and self._repair_csv_tail(last_record, fieldnames)
+        self._csv_file = open(output_csv, 'a', newline='', encoding='utf-8-sig')
+        self._csv_writer = csv.DictWriter(self._csv_file, fieldnames=fieldnames)
+        if not csv_exists:
+            self._csv_writer.writeheader()
+        if missing_row:
+            self._csv_writer.writerow(last_record)
+            self._csv_file.flush()
+
+        self._journal_file = open(journal_path, 'a', encoding='utf-8')
+
+    def _load(self):
+        """读取已完成的 SKU，返回日志中最后一条完整记录"""
+        valid_size = 0
+        last_record = None
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 崩溃时可能留下写了一半的最后一行，截断后从这里继续
+                    break
+                self.done.add(str(record['product_id']))
+                valid_size += len(line)
+                last_record = record
+
+        if valid_size != os.path.getsize(self.journal_path):
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(valid_size)
+        return last_record
+
+    def _repair_csv_tail(self, record, fieldnames):
+        """
+        检查 CSV 的最后一行是否就是日志中最后一条记录
+
+        写了一半的行会被截掉；返回 True 表示这条记录的 CSV 行缺失，需要补写
+        """
+        buffer = io.StringIO(newline='')
+        csv.DictWriter(buffer, fieldnames=fieldnames).writerow(record)
+        expected = buffer.getvalue().encode('utf-8')
+
+        with open(self.output_csv, 'r+b') as f:
+            size = f.seek(0, os.SEEK_END)
+            # 写了一半的行比完整的行短，往前多读两个字节就能看到上一行的换行符
+            start = max(0, size - len(expected) - 2)
+            f.seek(start)
+            tail = f.read()
+            if tail.endswith(expected):
+                return False
+            if not tail.endswith(b'\n'):
+                newline = tail.rfind(b'\n')
+                if newline >= 0:
+                    f.truncate(start + newline + 1)
+        return True
+
+    def is_done(self, product_id):
+        return str(product_id) in self.done
+
+    def pending(self, product_ids):
+        """逐个产出尚未完成的商品ID，product_ids 可以是生成器"""
+        for product_id in product_ids:
+            if str(product_id) not in self.done:
+                yield product_id
+
+    def record(self, result):
+        # 先写日志行，再写 CSV；两者之间崩溃时，续爬由 _repair_csv_tail 补写 CSV 行
+        self._journal_file.write(json.dumps(result, ensure_ascii=False) + '\n')
+        self._journal_file.flush()
+        self._csv_writer.writerow(result)
+        self._csv_file.flush()
+        self.done.add(str(result['product_id']))
+
+    def export_json(self, output_json):
+        """把日志流式转换为 JSON 数组文件"""
+        self._journal_file.flush()
+        with open(self.journal_path, 'r', encoding='utf-8') as src, \
+                open(output_json, 'w', encoding='utf-8') as dst:
+            dst.write('[')
+            first = True
+            for line in src:
+                line = line.strip()
+                if not line:
+                    continue
+                dst.write('\n    ' if first else ',\n    ')
+                dst.write(json.dumps(json.loads(line), ensure_ascii=False))
+                first = False
+            dst.write('\n]\n' if not first else ']\n')
+
+    def close(self):
+        for f in (self._csv_file, self._journal_file):
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
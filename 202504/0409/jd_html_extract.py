@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+京东商品页面标题提取。
+
+商品页面有几百 KB，而我们只需要 .sku-name 一个元素。默认的 scan 后端先用 str.find 定位
+.sku-name 的起始标签，再只对这一段做增量解析，读到匹配的结束标签就停止，不构建整棵 DOM。
+lxml / selectolax 后端在安装了对应库时可用；BeautifulSoup(html.parser) 作为兜底。
+"""
+
+import re
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup
+
+UNKNOWN_TITLE = "未知商品"
+
+# 匹配 class 中包含 sku-name 的起始标签
+_SKU_NAME_TAG = re.compile(
+    r'<([a-zA-Z][\w-]*)[^>]*?\bclass\s*=\s*(["\'])(?:[^"\']*\s)?sku-name(?:\s[^"\']*)?\2[^>]*>',
+    re.IGNORECASE
+)
+
+_VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+}
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class _ElementTextParser(HTMLParser):
+    """收集第一个元素内的全部文本，遇到它的结束标签即停止"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.depth = 0
+        self.parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in _VOID_TAGS:
+            self.depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        pass
+
+    def handle_endtag(self, tag):
+        if tag in _VOID_TAGS:
+            return
+        self.depth -= 1
+        if self.depth <= 0:
+            raise _StopParsing
+
+    def handle_data(self, data):
+        if self.depth > 0:
+            self.parts.append(data)
+
+
+def _find_sku_name_tag(html):
+    # 先用 str.find 定位关键字，再回溯到所在标签的起点做锚定匹配，避免正则扫描整页
+    pos = html.find('sku-name')
+    while pos != -1:
+        start = html.rfind('<', 0, pos)
+        if start != -1 and _SKU_NAME_TAG.match(html, start):
+            return start
+        pos = html.find('sku-name', pos + 1)
+    return None
+
+
+def extract_title_scan(html):
+    """只解析 .sku-name 所在片段，找不到时返回 None"""
+    start = _find_sku_name_tag(html)
+    if start is None:
+        return None
+
+    parser = _ElementTextParser()
+    try:
+        parser.feed(html[start:])
+        parser.close()
+    except _StopParsing:
+        pass
+    return ''.join(parser.parts).strip()
+
+
+def extract_title_lxml(html):
+    import lxml.html
+
+    nodes = lxml.html.fromstring(html).find_class('sku-name')
+    return nodes[0].text_content().strip() if nodes else None
+
+
+def extract_title_selectolax(html):
+    from selectolax.parser import HTMLParser as SelectolaxParser
+
+    node = SelectolaxParser(html).css_first('.sku-name')
+    return node.text().strip() if node is not None else None
+
+
+def extract_title_bs4(html):
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # 标题容错处理
+    title_tag = soup.select_one('.sku-name') or soup.select_one('.itemInfo-wrap .sku-name')
+    return title_tag.text.strip() if title_tag else None
+
+
+BACKENDS = {
+    'scan': extract_title_scan,
+    'lxml': extract_title_lxml,
+    'selectolax': extract_title_selectolax,
+    'bs4': extract_title_bs4,
+}
+
+
+def extract_title(html, backend='scan'):
+    """
+    提取商品标题
+
+    参数:
+        html (str): 商品页面 HTML
+        backend (str): 解析后端，可选 scan / lxml / selectolax / bs4
+
+    返回:
+        str: 商品标题，提取失败时为 "未知商品"
+    """
+    title = None
+    if backend != 'bs4':
+        try:
+            title = BACKENDS[backend](html)
+        except ImportError:
+            title = None
+    # 快速路径没找到（或依赖未安装）时回退到完整解析
+    if title is None:
+        title = extract_title_bs4(html)
+    return title if title is not None else UNKNOWN_TITLE
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+商品页面的本地 HTTP 缓存。
+
+保存响应的 ETag / Last-Modified 和压缩后的正文，下次请求同一页面时带上
+If-None-Match / If-Modified-Since。页面未变化时服务器只返回 304，正文直接从本地读取，
+重复爬取时大部分请求不再传输完整页面。
+"""
+
+import sqlite3
+import time
+import zlib
+
+
+class HttpCache:
+    """基于 SQLite 的条件请求缓存，正文用 zlib 压缩存储"""
+
+    def __init__(self, db_path='jd_http_cache.db'):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url           TEXT PRIMARY KEY,
+                etag          TEXT,
+                last_modified TEXT,
+                body          BLOB NOT NULL,
+                stored_at     REAL NOT NULL
+            )
+        ''')
+        self.conn.commit()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """清空本次运行的命中统计，缓存内容保留"""
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def conditional_headers(self, url):
+        """返回该 URL 的条件请求头，没有缓存时为空字典"""
+        row = self.conn.execute(
+            'SELECT etag, last_modified FROM http_cache WHERE url = ?', (url,)
+        ).fetchone()
+        headers = {}
+        if row:
+            etag, last_modified = row
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def resolve(self, url, status, headers, text):
+        """
+        处理响应：304 时返回缓存的正文，200 时更新缓存
+
+        参数:
+            url (str): 请求地址
+            status (int): HTTP 状态码
+            headers (Mapping): 响应头
+            text (str): 响应正文（304 时为空）
+
+        返回:
+            tuple: (状态码, 正文)，命中缓存时状态码视为 200
+        """
+        if status == 304:
+            row = self.conn.execute('SELECT body FROM http_cache WHERE url = ?', (url,)).fetchone()
+            if row is None:
+                return status, None
+            self.hits += 1
+            body = zlib.decompress(row[0]).decode('utf-8')
+            self.bytes_saved += len(body.encode('utf-8'))
+            return 200, body
+
+        if status == 200:
+            self.misses += 1
+            etag = headers.get('ETag')
+            last_modified = headers.get('Last-Modified')
+            # 没有校验字段的响应无法做条件请求，不缓存
+            if etag or last_modified:
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO http_cache (url, etag, last_modified, body, stored_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (url, etag, last_modified, zlib.compress(text.encode('utf-8'), 6), time.time())
+                )
+                self.conn.commit()
+
+        return status, text
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self):
+        return (f"HTTP 缓存命中 {self.hits}/{self.hits + self.misses} "
+                f"({self.hit_ratio:.1%})，节省下载 {self.bytes_saved / 1024 / 1024:.2f} MB")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
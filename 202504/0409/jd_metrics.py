@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+爬虫性能指标。
+
+记录各接口（商品页面 item / 价格接口 price）的请求耗时直方图、传输字节数、状态码、
+按原因分类的重试次数、标题解析耗时和每秒完成的商品数。运行结束时输出 JSON 摘要，
+也可以启动一个本地 HTTP 端点，以 Prometheus 文本格式暴露这些指标。
+"""
+
+import json
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PARSE_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+
+
+def failure_cause(status):
+    """把失败的状态码归类为重试原因"""
+    if status == 429:
+        return 'status_429'
+    if status >= 500:
+        return 'status_5xx'
+    return f'status_{status}'
+
+
+class Histogram:
+    """累积分桶直方图（与 Prometheus histogram 语义一致）"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+    def quantile(self, q):
+        """按桶上界估算分位数"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        for bound, total in self.cumulative():
+            if total >= target:
+                return bound if bound != float('inf') else self.buckets[-1]
+        return self.buckets[-1]
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'avg': round(self.sum / self.count, 6) if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'buckets': {('+Inf' if bound == float('inf') else str(bound)): total
+                        for bound, total in self.cumulative()},
+        }
+
+
+class CrawlMetrics:
+    """一次爬取运行的指标汇总"""
+
+    def __init__(self):
+        self._server = None
+        self.reset()
+
+    def reset(self):
+        """清空所有计数器和直方图（/metrics 端点保持运行）"""
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.parse_time = Histogram(PARSE_BUCKETS)
+        self.bytes = defaultdict(int)
+        self.responses = defaultdict(int)
+        self.retries = defaultdict(int)
+        self.skus_ok = 0
+        self.skus_failed = 0
+        self.started_at = None
+        self.finished_at = None
+
+    def start_run(self):
+        # 同一个爬虫对象多次运行时，每次的摘要只统计本次运行
+        self.reset()
+        self.started_at = time.time()
+
+    def finish_run(self):
+        self.finished_at = time.time()
+
+    def observe_request(self, endpoint, status, latency, nbytes=0):
+        """记录一次请求，status 为 None 表示请求异常"""
+        self.latency[endpoint].observe(latency)
+        self.bytes[endpoint] += nbytes
+        self.responses[(endpoint, str(status) if status is not None else 'error')] += 1
+
+    def observe_parse(self, seconds):
+        self.parse_time.observe(seconds)
+
+    def retry(self, cause):
+        """记录一次失败的尝试，cause 如 status_429、status_5xx、timeout、error"""
+        self.retries[cause] += 1
+
+    def sku_done(self, ok=True):
+        if ok:
+            self.skus_ok += 1
+        else:
+            self.skus_failed += 1
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def summary(self):
+        elapsed = self.elapsed
+        return {
+            'elapsed_seconds': round(elapsed, 3),
+            'skus_ok': self.skus_ok,
+            'skus_failed': self.skus_failed,
+            'skus_per_second': round(self.skus_ok / elapsed, 3) if elapsed else 0.0,
+            'bytes': dict(self.bytes),
+            'responses': {f'{endpoint}:{status}': count
+                          for (endpoint, status), count in sorted(self.responses.items())},
+            'retries': dict(self.retries),
+            'latency_seconds': {endpoint: hist.summary() for endpoint, hist in self.latency.items()},
+            'parse_seconds': self.parse_time.summary(),
+        }
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=4)
+
+    def to_prometheus(self):
+        """生成 Prometheus 文本格式的指标"""
+        lines = [
+            '# TYPE jd_crawler_request_seconds histogram',
+        ]
+        for endpoint, hist in self.latency.items():
+            lines.extend(self._histogram_lines('jd_crawler_request_seconds', hist, f'endpoint="{endpoint}"'))
+        lines.append('# TYPE jd_crawler_parse_seconds histogram')
+        lines.extend(self._histogram_lines('jd_crawler_parse_seconds', self.parse_time, ''))
+
+        lines.append('# TYPE jd_crawler_bytes_total counter')
+        for endpoint, nbytes in self.bytes.items():
+            lines.append(f'jd_crawler_bytes_total{{endpoint="{endpoint}"}} {nbytes}')
+        lines.append('# TYPE jd_crawler_responses_total counter')
+        for (endpoint, status), count in self.responses.items():
+            lines.append(f'jd_crawler_responses_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+        lines.append('# TYPE jd_crawler_retries_total counter')
+        for cause, count in self.retries.items():
+            lines.append(f'jd_crawler_retries_total{{cause="{cause}"}} {count}')
+        lines.append('# TYPE jd_crawler_skus_total counter')
+        lines.append(f'jd_crawler_skus_total{{result="ok"}} {self.skus_ok}')
+        lines.append(f'jd_crawler_skus_total{{result="failed"}} {self.skus_failed}')
+        elapsed = self.elapsed
+        lines.append('# TYPE jd_crawler_skus_per_second gauge')
+        lines.append(f'jd_crawler_skus_per_second {self.skus_ok / elapsed if elapsed else 0.0}')
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _histogram_lines(name, hist, labels):
+        sep = ',' if labels else ''
+        for bound, total in hist.cumulative():
+            le = '+Inf' if bound == float('inf') else bound
+            yield f'{name}_bucket{{{labels}{sep}le="{le}"}} {total}'
+        suffix = f'{{{labels}}}' if labels else ''
+        yield f'{name}_sum{suffix} {hist.sum}'
+        yield f'{name}_count{suffix} {hist.count}'
+
+    def serve(self, port=9108, host='127.0.0.1'):
+        """在后台线程中启动 /metrics 端点"""
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') not in ('', '/metrics'):
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = metrics.to_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+    def stop_server(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -1,14 +1,23 @@
 import requests
-from bs4 import BeautifulSoup
-import csv
-import json
+import aiohttp
+import asyncio
+import argparse
+import itertools
 import time
 import random
 import logging
 from fake_useragent import UserAgent
 from datetime import datetime
+from urllib.parse import urlparse
 import os
-import sys
+
+from jd_crawl_journal import CrawlJournal
+from jd_http_cache import HttpCache
+from jd_html_extract import extract_title, UNKNOWN_TITLE
+from jd_metrics import CrawlMetrics, failure_cause
+from jd_price_history import PriceHistoryStore
+from jd_rate_controller import AdaptiveRateController, parse_retry_after
+from jd_title_cache import SkuTitleCache
 
 # 配置日志
 logging.basicConfig(
@@ -23,10 +32,39 @@ logger = logging.getLogger(__name__)
 
 
 class JDPriceCrawler:
-    def __init__(self, max_retries=3, timeout=10, delay_range=(1, 3)):
+    ITEM_URL = "https://item.jd.com/{product_id}.html"
+    PRICE_API_URL = "https://p.3.cn/prices/mgets?skuIds={sku_ids}"
+    FIELDNAMES = ['product_id', 'title', 'price', 'original_price', 'discount', 'crawl_time']
+
+    def __init__(self, max_retries=3, timeout=10, delay_range=(1, 3),
+                 item_url=None, price_api_url=None, price_batch_size=50, title_cache=None,
+                 html_backend='scan', adaptive_rate=False, http_cache=None, price_history=None,
+                 metrics_path=None, shared_limiter=None):
         self.max_retries = max_retries
         self.timeout = timeout
         self.delay_range = delay_range
+        # 每次 mgets 请求合并的 SKU 数
+        self.price_batch_size = price_batch_size
+        # SkuTitleCache 实例，命中时跳过商品页面的下载
+        self.title_cache = title_cache
+        # 标题解析后端，见 jd_html_extract.BACKENDS
+        self.html_backend = html_backend
+        # 启用后按服务器响应自动调节请求速率，取代固定的随机延时
+        self.adaptive_rate = adaptive_rate
+        self._rate_controllers = {}
+        # 多进程分片时所有进程共用的按主机限速器（jd_sharded_crawler.SharedRateLimiter），
+        # 每个进程照常随机等待，合计速率不超过配置的预算
+        self.shared_limiter = shared_limiter
+        # HttpCache 实例，商品页面使用条件请求，未变化时只传输 304
+        self.http_cache = http_cache
+        # PriceHistoryStore 实例，只在价格变化时写入历史
+        self.price_history = price_history
+        # 性能指标，metrics_path 不为空时每次运行结束写入 JSON 摘要
+        self.metrics = CrawlMetrics()
+        self.metrics_path = metrics_path
+        # 可替换为本地测试服务器地址
+        self.item_url = item_url or self.ITEM_URL
+        self.price_api_url = price_api_url or self.PRICE_API_URL
         self.ua = UserAgent()
         self.session = requests.Session()
 
@@ -45,111 +83,631 @@ class JDPriceCrawler:
         logger.debug(f"等待 {delay:.2f} 秒...")
         time.sleep(delay)
 
-    def get_product_price(self, product_id):
-        url = f"https://item.jd.com/{product_id}.html"
+    def get_page_headers(self, url):
+        headers = self.get_random_headers()
+        if self.http_cache is not None:
+            headers.update(self.http_cache.conditional_headers(url))
+        return headers
+
+    def resolve_page(self, url, status, headers, text):
+        # 304 时取回缓存的页面，200 时写入缓存
+        if self.http_cache is None:
+            return status, text
+        return self.http_cache.resolve(url, status, headers, text)
+
+    def save_result(self, journal, result):
+        journal.record(result)
+        self.metrics.sku_done()
+        if self.price_history is not None:
+            self.price_history.record(result)
+
+    def start_run(self):
+        # 同一个爬虫对象多次运行时，指标和缓存命中率都只统计本次运行
+        self.metrics.start_run()
+        if self.http_cache is not None:
+            self.http_cache.reset_stats()
+
+    def finish_run(self):
+        self.metrics.finish_run()
+        summary = self.metrics.summary()
+        logger.info(f"共完成 {summary['skus_ok']} 个商品，失败 {summary['skus_failed']} 个，"
+                    f"{summary['skus_per_second']} 个/秒，重试 {summary['retries']}")
+        if self.metrics_path:
+            self.metrics.write_json(self.metrics_path)
+            logger.info(f"性能指标已保存至 {self.metrics_path}")
+        if self.http_cache is not None:
+            logger.info(self.http_cache.report())
+
+    def _get_rate_controller(self, url):
+        host = urlparse(url).netloc
+        if host not in self._rate_controllers:
+            self._rate_controllers[host] = AdaptiveRateController(initial_rate=1.0, min_rate=0.1, max_rate=20.0)
+        return self._rate_controllers[host]
+
+    def wait_before_request(self, url, attempt):
+        if self.adaptive_rate:
+            delay = self._get_rate_controller(url).reserve()
+            if delay > 0:
+                time.sleep(delay)
+        else:
+            # 指数退避 + 随机延时
+            self.random_delay(base_delay=2 ** attempt)
+        self.wait_shared_limit(url)
+
+    def wait_shared_limit(self, url):
+        if self.shared_limiter is not None:
+            delay = self.shared_limiter.reserve(urlparse(url).netloc)
+            if delay > 0:
+                time.sleep(delay)
+
+    def record_response(self, endpoint, url, status, latency=None, headers=None, nbytes=0):
+        if latency is not None:
+            self.metrics.observe_request(endpoint, status, latency, nbytes)
+        if self.adaptive_rate:
+            retry_after = parse_retry_after(headers.get('Retry-After')) if headers else None
+            self._get_rate_controller(url).record(status, latency, retry_after)
+
+    def parse_title(self, html):
+        start = time.perf_counter()
+        title = extract_title(html, backend=self.html_backend)
+        self.metrics.observe_parse(time.perf_counter() - start)
+        return title
+
+    def parse_price(self, item):
+        if item:
+            price = item.get('p', '未知价格')
+            original_price = item.get('op', '未知原价')
+            discount = "是" if price < original_price else "否"
+        else:
+            price = original_price = discount = '获取失败'
+        return price, original_price, discount
+
+    def parse_prices(self, price_data, product_ids):
+        # mgets 返回 [{'id': 'J_xxx', 'p': ..., 'op': ...}, ...]，按 SKU 分发回各商品
+        # 返回的不是列表（如 {"error": ...}）时整批视为请求失败，返回 None 由调用方重试
+        if not isinstance(price_data, list):
+            return None
+        items = {str(item.get('id', '')).replace('J_', ''): item for item in price_data if isinstance(item, dict)}
+        return {str(pid): self.parse_price(items.get(str(pid))) for pid in product_ids}
+
+    def build_price_url(self, product_ids):
+        return self.price_api_url.format(sku_ids=','.join(f"J_{pid}" for pid in product_ids))
+
+    def build_result(self, product_id, title, price, original_price, discount):
+        return {
+            'product_id': product_id,
+            'title': title,
+            'price': price,
+            'original_price': original_price,
+            'discount': discount,
+            'crawl_time': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+    def get_product_title(self, product_id):
+        if self.title_cache is not None:
+            title = self.title_cache.get(product_id)
+            if title is not None:
+                return title
+
+        title = self._fetch_product_title(product_id)
+        self._cache_title(product_id, title)
+        return title
+
+    def _cache_title(self, product_id, title):
+        # 解析失败的标题不缓存，下次重新抓取
+        if self.title_cache is not None and title not in (None, UNKNOWN_TITLE):
+            self.title_cache.set(product_id, title)
+
+    def _fetch_product_title(self, product_id):
+        url = self.item_url.format(product_id=product_id)
 
         for attempt in range(self.max_retries):
             try:
-                logger.info(f"获取商品 {product_id} 的价格 (第 {attempt+1} 次尝试)")
+                logger.info(f"获取商品 {product_id} 的页面 (第 {attempt+1} 次尝试)")
 
-                # 指数退避 + 随机延时
-                self.random_delay(base_delay=2 ** attempt)
+                self.wait_before_request(url, attempt)
 
+                start = time.monotonic()
                 response = self.session.get(
                     url,
-                    headers=self.get_random_headers(),
+                    headers=self.get_page_headers(url),
                     timeout=self.timeout
                 )
+                self.record_response('item', url, response.status_code, time.monotonic() - start,
+                                     response.headers, len(response.content))
 
-                if response.status_code != 200:
-                    logger.warning(f"请求失败，状态码: {response.status_code}")
+                status, html = self.resolve_page(url, response.status_code, response.headers, response.text)
+                if status != 200:
+                    self.metrics.retry(failure_cause(status))
+                    logger.warning(f"请求失败，状态码: {status}")
                     continue
 
-                soup = BeautifulSoup(response.text, 'html.parser')
+                return self.parse_title(html)
 
-                # 标题容错处理
-                title_tag = soup.select_one('.sku-name') or soup.select_one('.itemInfo-wrap .sku-name')
-                title = title_tag.text.strip() if title_tag else "未知商品"
+            except requests.exceptions.Timeout:
+                self.record_response('item', url, None, time.monotonic() - start)
+                self.metrics.retry('timeout')
+                logger.warning(f"请求超时 (尝试 {attempt+1})")
+            except requests.exceptions.RequestException as e:
+                self.record_response('item', url, None, time.monotonic() - start)
+                self.metrics.retry('error')
+                logger.error(f"请求异常: {e}")
+            except Exception as e:
+                self.metrics.retry('error')
+                logger.error(f"未知错误: {e}")
 
-                # 价格 API 请求
-                price_api_url = f"https://p.3.cn/prices/mgets?skuIds=J_{product_id}"
-                price_response = self.session.get(
-                    price_api_url,
-                    headers=self.get_random_headers(),
-                    timeout=self.timeout
-                )
+        return None
 
-                if price_response.status_code == 200:
+    def get_prices(self, product_ids):
+        """批量获取价格，每 price_batch_size 个 SKU 合并为一次 mgets 请求"""
+        product_ids = [str(pid) for pid in product_ids]
+        prices = {}
+
+        for i in range(0, len(product_ids), self.price_batch_size):
+            batch = product_ids[i:i + self.price_batch_size]
+            price_url = self.build_price_url(batch)
+            result = None
+
+            for attempt in range(self.max_retries):
+                if attempt or self.adaptive_rate:
+                    self.wait_before_request(price_url, attempt)
+                else:
+                    self.wait_shared_limit(price_url)
+                try:
+                    start = time.monotonic()
+                    price_response = self.session.get(
+                        price_url,
+                        headers=self.get_random_headers(),
+                        timeout=self.timeout
+                    )
+                    self.record_response('price', price_url, price_response.status_code,
+                                         time.monotonic() - start, price_response.headers,
+                                         len(price_response.content))
+                    if price_response.status_code != 200:
+                        self.metrics.retry(failure_cause(price_response.status_code))
+                        logger.warning(f"价格请求失败，状态码: {price_response.status_code}")
+                        result = dict.fromkeys(batch, ('请求失败',) * 3)
+                        continue
                     try:
-                        price_data = price_response.json()
-                        if price_data and len(price_data) > 0:
-                            price = price_data[0].get('p', '未知价格')
-                            original_price = price_data[0].get('op', '未知原价')
-                            discount = "是" if price < original_price else "否"
-                        else:
-                            price = original_price = discount = '获取失败'
+                        result = self.parse_prices(price_response.json(), batch)
                     except ValueError:
-                        price = original_price = discount = '解析失败'
-                else:
-                    price = original_price = discount = '请求失败'
+                        result = dict.fromkeys(batch, ('解析失败',) * 3)
+                    if result is None:
+                        # 与非 200 响应一样重试
+                        self.metrics.retry('error')
+                        logger.warning("价格接口返回的不是 SKU 列表")
+                        result = dict.fromkeys(batch, ('请求失败',) * 3)
+                        continue
+                    break
+                except requests.exceptions.RequestException as e:
+                    self.record_response('price', price_url, None, time.monotonic() - start)
+                    self.metrics.retry('timeout' if isinstance(e, requests.exceptions.Timeout) else 'error')
+                    logger.error(f"价格请求异常: {e}")
+                    result = dict.fromkeys(batch, ('请求失败',) * 3)
 
-                current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            prices.update(result)
 
-                return {
-                    'product_id': product_id,
-                    'title': title,
-                    'price': price,
-                    'original_price': original_price,
-                    'discount': discount,
-                    'crawl_time': current_time
-                }
+        return prices
 
-            except requests.exceptions.Timeout:
+    def get_product_price(self, product_id):
+        title = self.get_product_title(product_id)
+        if title is None:
+            logger.error(f"获取商品 {product_id} 价格失败")
+            return None
+
+        price, original_price, discount = self.get_prices([product_id])[str(product_id)]
+        return self.build_result(product_id, title, price, original_price, discount)
+
+    def open_journal(self, output_csv, output_json, journal_path=None, resume=False):
+        # 默认日志文件与 JSON 输出同名，扩展名为 .jsonl
+        if journal_path is None:
+            journal_path = os.path.splitext(output_json)[0] + '.jsonl'
+        journal = CrawlJournal(journal_path, output_csv, self.FIELDNAMES, resume=resume)
+        if journal.done:
+            logger.info(f"从 {journal_path} 续爬，跳过已完成的 {len(journal.done)} 个商品")
+        return journal
+
+    def crawl_products(self, product_ids, output_csv='jd_prices.csv', output_json='jd_prices.json',
+                       journal_path=None, resume=False):
+        self.start_run()
+        with self.open_journal(output_csv, output_json, journal_path, resume) as journal:
+            pending = journal.pending(product_ids)
+
+            # 先抓取一批商品的标题，再用一次 mgets 请求取回整批价格
+            while True:
+                batch = list(itertools.islice(pending, self.price_batch_size))
+                if not batch:
+                    break
+                titles = {pid: self.get_product_title(pid) for pid in batch}
+                prices = self.get_prices([pid for pid in batch if titles[pid] is not None])
+
+                for product_id in batch:
+                    if titles[product_id] is None:
+                        self.metrics.sku_done(ok=False)
+                        logger.error(f"❌ 获取失败：{product_id}")
+                        continue
+                    result = self.build_result(product_id, titles[product_id], *prices[str(product_id)])
+                    self.save_result(journal, result)
+                    logger.info(f"✅ 成功获取 {product_id}：¥{result['price']}")
+
+            # 输出为 JSON 文件
+            journal.export_json(output_json)
+
+        logger.info(f"爬取完成，CSV 保存至 {output_csv}，JSON 保存至 {output_json}")
+        self.finish_run()
+
+
+class HostLimiter:
+    """单个主机的并发数与请求速率限制（异步）"""
+
+    def __init__(self, concurrency=4, rate=2.0, controller=None):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        # 相邻两次请求的最小间隔（秒），rate 为每秒请求数
+        self.interval = 1.0 / rate if rate else 0
+        # AdaptiveRateController 实例，设置后速率随服务器响应动态调整
+        self.controller = controller
+        self._lock = asyncio.Lock()
+        self._next_time = 0.0
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        wait = 0
+        if self.controller is not None:
+            wait = self.controller.reserve()
+        elif self.interval:
+            async with self._lock:
+                now = asyncio.get_running_loop().time()
+                wait = self._next_time - now
+                self._next_time = max(now, self._next_time) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.semaphore.release()
+
+
+class PriceBatcher:
+    """收集待查询的 SKU，凑满一批或等待 linger 秒后发起一次 mgets 请求，再把结果分发给各个等待者"""
+
+    def __init__(self, fetch_batch, batch_size=50, linger=0.2):
+        self.fetch_batch = fetch_batch
+        self.batch_size = batch_size
+        self.linger = linger
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+
+    async def get(self, product_id):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((str(product_id), future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.linger, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        try:
+            prices = await self.fetch_batch([pid for pid, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for pid, future in batch:
+            if not future.done():
+                future.set_result(prices.get(pid, ('获取失败',) * 3))
+
+
+class AsyncJDPriceCrawler(JDPriceCrawler):
+    """异步并发版本：多个商品同时在途，按主机分别限制并发数和速率"""
+
+    # 主机 -> (最大并发数, 每秒请求数)
+    DEFAULT_HOST_LIMITS = {
+        'item.jd.com': (8, 4.0),
+        'p.3.cn': (4, 2.0),
+    }
+
+    def __init__(self, max_retries=3, timeout=10, delay_range=(1, 3),
+                 item_url=None, price_api_url=None, price_batch_size=50, title_cache=None,
+                 html_backend='scan', adaptive_rate=False, http_cache=None, price_history=None,
+                 metrics_path=None, host_limits=None, default_limit=(4, 2.0), workers=16, rate_share=1.0):
+        super().__init__(max_retries, timeout, delay_range, item_url, price_api_url,
+                         price_batch_size, title_cache, html_backend, adaptive_rate, http_cache,
+                         price_history, metrics_path)
+        # 本进程占每个主机并发数和速率的比例，多进程分片时为 1 / 进程数
+        self.rate_share = rate_share
+        self.host_limits = dict(self.DEFAULT_HOST_LIMITS)
+        if host_limits:
+            self.host_limits.update(host_limits)
+        self.default_limit = default_limit
+        self.workers = workers
+        self._limiters = {}
+        self._price_batcher = None
+
+    def _get_limiter(self, url):
+        # 以 host:port 区分预算，便于用不同端口的本地服务器模拟两个主机
+        host = urlparse(url).netloc
+        if host not in self._limiters:
+            concurrency, rate = self.host_limits.get(host, self.default_limit)
+            # 多进程分片时按 rate_share 分摊主机预算，每个进程至少保留 1 个并发
+            share = self.rate_share
+            concurrency = max(1, int(concurrency * share))
+            rate *= share
+            # 自适应模式下配置的速率作为初始速率
+            controller = AdaptiveRateController(initial_rate=rate, min_rate=0.1 * share,
+                                                max_rate=20.0 * share) if self.adaptive_rate else None
+            self._limiters[host] = HostLimiter(concurrency, rate, controller)
+        return self._limiters[host]
+
+    async def _fetch(self, session, url, as_json=False):
+        endpoint = 'price' if as_json else 'item'
+        limiter = self._get_limiter(url)
+        async with limiter:
+            start = time.monotonic()
+            try:
+                headers = self.get_random_headers() if as_json else self.get_page_headers(url)
+                async with session.get(url, headers=headers) as response:
+                    body = await response.read()
+                    latency = time.monotonic() - start
+                    self.metrics.observe_request(endpoint, response.status, latency, len(body))
+                    if limiter.controller is not None:
+                        limiter.controller.record(response.status, latency,
+                                                  parse_retry_after(response.headers.get('Retry-After')))
+                    if response.status not in (200, 304):
+                        self.metrics.retry(failure_cause(response.status))
+                    if as_json:
+                        if response.status != 200:
+                            return response.status, None
+                        return response.status, await response.json(content_type=None)
+                    text = await response.text() if response.status == 200 else None
+                    return self.resolve_page(url, response.status, response.headers, text)
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                self.metrics.observe_request(endpoint, None, time.monotonic() - start)
+                self.metrics.retry('timeout' if isinstance(e, asyncio.TimeoutError) else 'error')
+                if limiter.controller is not None:
+                    limiter.controller.record(None)
+                raise
+
+    async def _retry_backoff(self, attempt):
+        # 仅在重试时退避，常规节奏由 HostLimiter 控制；自适应模式下由速率控制器负责退避
+        if attempt and not self.adaptive_rate:
+            await asyncio.sleep(2 ** attempt + random.uniform(*self.delay_range))
+
+    async def get_product_title_async(self, session, product_id):
+        if self.title_cache is not None:
+            title = self.title_cache.get(product_id)
+            if title is not None:
+                return title
+
+        title = await self._fetch_product_title_async(session, product_id)
+        self._cache_title(product_id, title)
+        return title
+
+    async def _fetch_product_title_async(self, session, product_id):
+        url = self.item_url.format(product_id=product_id)
+
+        for attempt in range(self.max_retries):
+            try:
+                logger.info(f"获取商品 {product_id} 的页面 (第 {attempt+1} 次尝试)")
+
+                await self._retry_backoff(attempt)
+
+                status, html = await self._fetch(session, url)
+                if status != 200:
+                    logger.warning(f"请求失败，状态码: {status}")
+                    continue
+
+                return self.parse_title(html)
+
+            except asyncio.TimeoutError:
                 logger.warning(f"请求超时 (尝试 {attempt+1})")
-            except requests.exceptions.RequestException as e:
+            except aiohttp.ClientError as e:
                 logger.error(f"请求异常: {e}")
             except Exception as e:
                 logger.error(f"未知错误: {e}")
 
-        logger.error(f"获取商品 {product_id} 价格失败")
         return None
 
-    def crawl_products(self, product_ids, output_csv='jd_prices.csv', output_json='jd_prices.json'):
-        file_exists = os.path.isfile(output_csv)
-        results = []
-
-        with open(output_csv, 'a', newline='', encoding='utf-8-sig') as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                'product_id', 'title', 'price', 'original_price', 'discount', 'crawl_time'
-            ])
-            if not file_exists:
-                writer.writeheader()
-
-            for product_id in product_ids:
-                result = self.get_product_price(product_id)
-                if result:
-                    writer.writerow(result)
-                    results.append(result)
-                    logger.info(f"✅ 成功获取 {product_id}：¥{result['price']}")
-                else:
-                    logger.error(f"❌ 获取失败：{product_id}")
+    async def get_prices_async(self, session, product_ids):
+        """一次 mgets 请求获取一批 SKU 的价格"""
+        product_ids = [str(pid) for pid in product_ids]
+        result = dict.fromkeys(product_ids, ('请求失败',) * 3)
 
-        # 输出为 JSON 文件
-        with open(output_json, 'w', encoding='utf-8') as jf:
-            json.dump(results, jf, ensure_ascii=False, indent=4)
+        for attempt in range(self.max_retries):
+            await self._retry_backoff(attempt)
+            try:
+                status, price_data = await self._fetch(session, self.build_price_url(product_ids), as_json=True)
+                if status != 200:
+                    logger.warning(f"价格请求失败，状态码: {status}")
+                    continue
+                prices = self.parse_prices(price_data, product_ids)
+                if prices is None:
+                    logger.warning("价格接口返回的不是 SKU 列表")
+                    continue
+                return prices
+            except ValueError:
+                return dict.fromkeys(product_ids, ('解析失败',) * 3)
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                logger.error(f"价格请求异常: {e!r}")
+
+        return result
+
+    async def get_product_price_async(self, session, product_id):
+        title = await self.get_product_title_async(session, product_id)
+        if title is None:
+            logger.error(f"获取商品 {product_id} 价格失败")
+            return None
+
+        if self._price_batcher is not None:
+            prices = await self._price_batcher.get(product_id)
+        else:
+            prices = (await self.get_prices_async(session, [product_id]))[str(product_id)]
+        return self.build_result(product_id, title, *prices)
+
+    async def crawl_products_async(self, product_ids, output_csv='jd_prices.csv', output_json='jd_prices.json',
+                                   journal_path=None, resume=False):
+        # 限流器绑定当前事件循环，每次运行重新创建
+        self._limiters = {}
+        self.start_run()
+
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        connector = aiohttp.TCPConnector(limit=self.workers * 2)
+
+        with self.open_journal(output_csv, output_json, journal_path, resume) as journal:
+            # 各 worker 共用一个迭代器按需取商品ID，不预先载入整个列表
+            pending_ids = journal.pending(product_ids)
+
+            async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+                self._price_batcher = PriceBatcher(
+                    lambda batch: self.get_prices_async(session, batch),
+                    batch_size=self.price_batch_size
+                )
+                # 标题取回后不等价格，继续抓下一个页面；等待价格的商品数有上限
+                pending = asyncio.Semaphore(self.price_batch_size * 2)
+                tasks = set()
+
+                async def finish(product_id, title):
+                    try:
+                        result = self.build_result(product_id, title, *await self._price_batcher.get(product_id))
+                        self.save_result(journal, result)
+                        logger.info(f"✅ 成功获取 {product_id}：¥{result['price']}")
+                    finally:
+                        pending.release()
+
+                async def worker():
+                    for product_id in pending_ids:
+                        title = await self.get_product_title_async(session, product_id)
+                        if title is None:
+                            self.metrics.sku_done(ok=False)
+                            logger.error(f"❌ 获取失败：{product_id}")
+                            continue
+                        await pending.acquire()
+                        task = asyncio.ensure_future(finish(product_id, title))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+
+                try:
+                    await asyncio.gather(*(worker() for _ in range(self.workers)))
+                    if tasks:
+                        await asyncio.gather(*tasks)
+                finally:
+                    self._price_batcher = None
+
+            journal.export_json(output_json)
 
         logger.info(f"爬取完成，CSV 保存至 {output_csv}，JSON 保存至 {output_json}")
+        self.finish_run()
+
+    def crawl_products(self, product_ids, output_csv='jd_prices.csv', output_json='jd_prices.json',
+                       journal_path=None, resume=False):
+        asyncio.run(self.crawl_products_async(product_ids, output_csv, output_json, journal_path, resume))
+
+
+def read_product_ids(path):
+    """逐行读取商品ID文件，忽略空行"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
 
 
 def main():
-    # 支持命令行传参
-    if len(sys.argv) > 1:
-        product_ids = sys.argv[1:]
+    parser = argparse.ArgumentParser(description='京东商品价格爬虫')
+    parser.add_argument('product_ids', nargs='*', help='商品ID列表')
+    parser.add_argument('--ids-file', help='商品ID文件，每行一个')
+    parser.add_argument('--async', dest='use_async', action='store_true', help='使用异步并发模式')
+    parser.add_argument('--workers', type=int, default=16, help='异步模式下的并发任务数')
+    parser.add_argument('--shards', type=int, default=0,
+                        help='多进程分片爬取的进程数，0 表示不分片。--item-limit / --price-limit 是所有进程合计的预算：'
+                             '同步模式下各进程共用一个限速器，页面解析并行；异步模式下并发数和速率按 1/N 分给各进程，'
+                             '每个进程至少 1 个并发，进程数大于配置的并发数时合计并发会超出预算')
+    parser.add_argument('--price-batch', type=int, default=50, help='每次价格请求合并的 SKU 数')
+    parser.add_argument('--adaptive', action='store_true', help='根据服务器响应自动调节请求速率')
+    parser.add_argument('--resume', action='store_true', help='从上次中断处继续，跳过日志中已完成的商品')
+    parser.add_argument('--http-cache', metavar='DB', help='HTTP 缓存 SQLite 文件，页面未变化时只传输 304')
+    parser.add_argument('--metrics-json', default='jd_metrics.json', help='每次运行结束写入的性能指标文件')
+    parser.add_argument('--metrics-port', type=int, help='在该端口启动 Prometheus 格式的 /metrics 端点')
+    parser.add_argument('--price-history', metavar='DB', help='价格历史 SQLite 文件，只记录价格变化')
+    parser.add_argument('--title-cache', metavar='DB', help='标题缓存 SQLite 文件，重复爬取时跳过商品页面')
+    parser.add_argument('--title-ttl', type=float, default=7, help='标题缓存有效期（天）')
+    parser.add_argument('--html-backend', default='scan', choices=['scan', 'lxml', 'selectolax', 'bs4'],
+                        help='商品标题解析后端')
+    parser.add_argument('--item-limit', type=float, nargs=2, metavar=('并发', '每秒请求'),
+                        default=AsyncJDPriceCrawler.DEFAULT_HOST_LIMITS['item.jd.com'],
+                        help='item.jd.com 的并发数与速率（同步模式只在 --shards 时使用速率）')
+    parser.add_argument('--price-limit', type=float, nargs=2, metavar=('并发', '每秒请求'),
+                        default=AsyncJDPriceCrawler.DEFAULT_HOST_LIMITS['p.3.cn'],
+                        help='p.3.cn 的并发数与速率（同步模式只在 --shards 时使用速率）')
+    args = parser.parse_args()
+
+    if args.ids_file:
+        product_ids = read_product_ids(args.ids_file)
     else:
-        product_ids = ['100012043978']  # 默认商品ID
+        product_ids = args.product_ids or ['100012043978']  # 默认商品ID
+
+    crawler_kwargs = dict(
+        max_retries=3, timeout=10, delay_range=(1, 3),
+        price_batch_size=args.price_batch,
+        html_backend=args.html_backend,
+        adaptive_rate=args.adaptive,
+        metrics_path=args.metrics_json
+    )
+    host_limits = {
+        'item.jd.com': (int(args.item_limit[0]), args.item_limit[1]),
+        'p.3.cn': (int(args.price_limit[0]), args.price_limit[1]),
+    }
+    if args.use_async:
+        crawler_kwargs.update(host_limits=host_limits, workers=args.workers)
+
+    if args.shards:
+        from jd_sharded_crawler import crawl_sharded
+
+        # 缓存以文件路径传给各工作进程
+        crawler_kwargs.update(title_cache=args.title_cache, title_ttl=args.title_ttl * 24 * 3600,
+                              http_cache=args.http_cache, price_history=args.price_history,
+                              host_limits=host_limits)
+        # 各分片分别写入自己的指标文件
+        crawler_kwargs.pop('metrics_path')
+        try:
+            crawl_sharded(product_ids, workers=args.shards, resume=args.resume,
+                          use_async=args.use_async, crawler_kwargs=crawler_kwargs)
+        except RuntimeError:
+            # 失败的分片已记录在日志中
+            raise SystemExit(1)
+        return
+
+    title_cache = None
+    if args.title_cache:
+        title_cache = SkuTitleCache(args.title_cache, ttl=args.title_ttl * 24 * 3600)
+
+    http_cache = HttpCache(args.http_cache) if args.http_cache else None
+    price_history = PriceHistoryStore(args.price_history) if args.price_history else None
+
+    crawler_cls = AsyncJDPriceCrawler if args.use_async else JDPriceCrawler
+    crawler = crawler_cls(title_cache=title_cache, http_cache=http_cache, price_history=price_history,
+                          **crawler_kwargs)
+    if args.metrics_port:
+        crawler.metrics.serve(args.metrics_port)
+        logger.info(f"性能指标端点: http://127.0.0.1:{args.metrics_port}/metrics")
+    crawler.crawl_products(product_ids, resume=args.resume)
+    crawler.metrics.stop_server()
 
-    crawler = JDPriceCrawler(max_retries=3, timeout=10, delay_range=(1, 3))
-    crawler.crawl_products(product_ids)
+    for cache in (title_cache, http_cache, price_history):
+        if cache is not None:
+            cache.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+商品价格历史库。
+
+只有价格或原价发生变化时才写入一行，表以 (product_id, crawl_time) 为主键，
+并按 crawl_time 建索引。每行同时保存变化前的价格，查询“某商品在某时刻的价格”和
+“最近 24 小时内的降价”都只需一次索引查找，不随爬取次数线性变慢。
+
+用法:
+    python jd_price_history.py import jd_prices.csv     # 导入已有的 CSV 记录
+    python jd_price_history.py at 100012043978 "2025-04-09 12:00:00"
+    python jd_price_history.py drops --hours 24
+"""
+
+import argparse
+import csv
+import sqlite3
+from datetime import datetime, timedelta
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _to_price(value):
+    # 爬取失败时价格字段是“请求失败”等文字，这类记录不进入历史
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class PriceHistoryStore:
+    """基于 SQLite 的价格历史，只记录价格变化"""
+
+    def __init__(self, db_path='jd_price_history.db'):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS price_history (
+                product_id          TEXT NOT NULL,
+                crawl_time          TEXT NOT NULL,
+                price               REAL NOT NULL,
+                original_price      REAL,
+                prev_price          REAL,
+                prev_original_price REAL,
+                title               TEXT,
+                PRIMARY KEY (product_id, crawl_time)
+            ) WITHOUT ROWID
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_price_history_time ON price_history (crawl_time)')
+        self.conn.commit()
+
+    def latest(self, product_id):
+        """返回商品最近一次记录的 (price, original_price)，没有记录时为 None"""
+        return self.conn.execute(
+            'SELECT price, original_price FROM price_history '
+            'WHERE product_id = ? ORDER BY crawl_time DESC LIMIT 1',
+            (str(product_id),)
+        ).fetchone()
+
+    def record(self, result, commit=True):
+        """
+        记录一次爬取结果，价格与上次相同时不写入
+
+        参数:
+            result (dict): 爬虫返回的结果
+            commit (bool): 是否立即提交
+
+        返回:
+            bool: 是否写入了新记录
+        """
+        price = _to_price(result.get('price'))
+        if price is None:
+            return False
+        original_price = _to_price(result.get('original_price'))
+        product_id = str(result['product_id'])
+
+        previous = self.latest(product_id)
+        if previous is not None and previous == (price, original_price):
+            return False
+
+        prev_price, prev_original_price = previous if previous else (None, None)
+        self.conn.execute(
+            'INSERT OR REPLACE INTO price_history '
+            '(product_id, crawl_time, price, original_price, prev_price, prev_original_price, title) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (product_id, result['crawl_time'], price, original_price,
+             prev_price, prev_original_price, result.get('title'))
+        )
+        if commit:
+            self.conn.commit()
+        return True
+
+    def record_many(self, results):
+        written = sum(self.record(result, commit=False) for result in results)
+        self.conn.commit()
+        return written
+
+    def import_csv(self, csv_path):
+        """导入 jd_prices.csv，按时间顺序只保留价格变化的行"""
+        with open(csv_path, 'r', encoding='utf-8-sig') as f:
+            rows = sorted(csv.DictReader(f), key=lambda row: row['crawl_time'])
+        return self.record_many(rows)
+
+    def price_at(self, product_id, when):
+        """
+        查询商品在某一时刻的价格
+
+        参数:
+            product_id (str): 商品ID
+            when (str | datetime): 查询时刻
+
+        返回:
+            dict: 当时生效的价格记录，没有记录时为 None
+        """
+        if isinstance(when, datetime):
+            when = when.strftime(TIME_FORMAT)
+        row = self.conn.execute(
+            'SELECT crawl_time, price, original_price, title FROM price_history '
+            'WHERE product_id = ? AND crawl_time <= ? ORDER BY crawl_time DESC LIMIT 1',
+            (str(product_id), when)
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('crawl_time', 'price', 'original_price', 'title'), row), product_id=str(product_id))
+
+    def price_drops(self, hours=24, now=None):
+        """返回最近 hours 小时内所有降价记录，按降幅从大到小排序"""
+        since = ((now or datetime.now()) - timedelta(hours=hours)).strftime(TIME_FORMAT)
+        rows = self.conn.execute(
+            'SELECT product_id, crawl_time, prev_price, price, title FROM price_history '
+            'WHERE crawl_time >= ? AND price < prev_price '
+            'ORDER BY prev_price - price DESC',
+            (since,)
+        ).fetchall()
+        return [dict(zip(('product_id', 'crawl_time', 'prev_price', 'price', 'title'), row)) for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='京东商品价格历史')
+    parser.add_argument('--db', default='jd_price_history.db', help='价格历史数据库文件')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help='导入爬虫输出的 CSV 文件')
+    import_parser.add_argument('csv_path')
+
+    at_parser = subparsers.add_parser('at', help='查询商品在某一时刻的价格')
+    at_parser.add_argument('product_id')
+    at_parser.add_argument('when', help='时间，格式 YYYY-MM-DD HH:MM:SS')
+
+    drops_parser = subparsers.add_parser('drops', help='列出最近的降价商品')
+    drops_parser.add_argument('--hours', type=float, default=24)
+
+    args = parser.parse_args()
+
+    with PriceHistoryStore(args.db) as store:
+        if args.command == 'import':
+            print(f"导入完成，写入 {store.import_csv(args.csv_path)} 条价格变化记录")
+        elif args.command == 'at':
+            record = store.price_at(args.product_id, args.when)
+            if record is None:
+                print(f"商品 {args.product_id} 在 {args.when} 之前没有价格记录")
+            else:
+                print(f"商品 {args.product_id} 在 {args.when} 的价格: ¥{record['price']:.2f}"
+                      f"（记录于 {record['crawl_time']}）")
+        elif args.command == 'drops':
+            drops = store.price_drops(args.hours)
+            print(f"最近 {args.hours:g} 小时内降价商品 {len(drops)} 个:")
+            for drop in drops:
+                print(f"{drop['crawl_time']}  {drop['product_id']}  "
+                      f"¥{drop['prev_price']:.2f} → ¥{drop['price']:.2f}  {drop['title'] or ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+自适应请求速率控制（AIMD：加性增、乘性减）。
+
+响应正常且较快时逐步提高请求速率；遇到 429/5xx、超时时速率减半；
+服务器返回 Retry-After 时在指定时间内暂停请求。这样爬虫会稳定在目标站点能承受的最高速率附近，
+而不是每次都按最坏情况固定等待。
+"""
+
+import time
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value):
+    """解析 Retry-After 头，支持秒数和 HTTP 日期两种格式，返回秒数或 None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateController:
+    """单个主机的 AIMD 速率控制器"""
+
+    def __init__(self, initial_rate=1.0, min_rate=0.1, max_rate=20.0,
+                 increase=0.2, decrease=0.5, slow_latency=2.0, cooldown=1.0):
+        """
+        初始化速率控制器
+
+        参数:
+            initial_rate (float): 初始速率（每秒请求数）
+            min_rate (float): 最低速率
+            max_rate (float): 最高速率
+            increase (float): 每次快速成功响应后增加的速率
+            decrease (float): 出错时速率乘以的系数
+            slow_latency (float): 超过该耗时（秒）的成功响应不再提速
+            cooldown (float): 两次降速的最小间隔（秒），并发请求同时失败时只降速一次
+        """
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_latency = slow_latency
+        self.cooldown = cooldown
+        self._last_decrease = float('-inf')
+        self._next_time = 0.0
+        self._blocked_until = 0.0
+
+    def reserve(self):
+        """预约下一个请求时间片，返回需要等待的秒数"""
+        now = time.monotonic()
+        start = max(now, self._next_time, self._blocked_until)
+        self._next_time = start + 1.0 / self.rate
+        return start - now
+
+    def record(self, status=None, latency=None, retry_after=None):
+        """
+        根据响应结果调整速率
+
+        参数:
+            status (int): HTTP 状态码，请求异常（如超时）时为 None
+            latency (float): 请求耗时（秒）
+            retry_after (float): Retry-After 指定的等待秒数
+        """
+        now = time.monotonic()
+        if retry_after is not None:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+
+        if status is None or status == 429 or status >= 500:
+            if now - self._last_decrease >= self.cooldown:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._last_decrease = now
+        elif status < 400 and (latency is None or latency < self.slow_latency):
+            self.rate = min(self.max_rate, self.rate + self.increase)
@@ -0,0 +1,302 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+多进程分片爬取。
+
+商品ID写入 SQLite 任务队列，多个工作进程按块领取任务，各自把结果写入分片目录下的
+shard_N.csv / shard_N.jsonl，全部完成后合并为最终的 jd_prices.csv 和 jd_prices.json。
+页面解析分散到多个 CPU 核上，适合几十万级别的商品列表。中断后可用 resume 继续，
+已写入分片日志的商品不会重复爬取。
+"""
+
+import glob
+import json
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import time
+
+from jd_crawl_journal import CrawlJournal
+from jd_http_cache import HttpCache
+from jd_price_crawler import JDPriceCrawler, AsyncJDPriceCrawler, logger
+from jd_price_history import PriceHistoryStore
+from jd_title_cache import SkuTitleCache
+
+
+class WorkQueue:
+    """基于 SQLite 的任务队列，多个进程可安全地并发领取任务"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS tasks (
+                product_id TEXT PRIMARY KEY,
+                status     TEXT NOT NULL DEFAULT 'pending',
+                worker     INTEGER
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status)')
+
+    def add(self, product_ids, chunk_size=10000):
+        """逐块写入商品ID，product_ids 可以是生成器"""
+        chunk = []
+        for product_id in product_ids:
+            chunk.append((str(product_id),))
+            if len(chunk) >= chunk_size:
+                self._insert(chunk)
+                chunk = []
+        if chunk:
+            self._insert(chunk)
+
+    def _insert(self, rows):
+        self.conn.execute('BEGIN')
+        self.conn.executemany('INSERT OR IGNORE INTO tasks (product_id) VALUES (?)', rows)
+        self.conn.execute('COMMIT')
+
+    def claim(self, worker_id, n):
+        """领取最多 n 个待处理任务"""
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            ids = [row[0] for row in self.conn.execute(
+                "SELECT product_id FROM tasks WHERE status = 'pending' LIMIT ?", (n,)
+            )]
+            self.conn.executemany(
+                "UPDATE tasks SET status = 'claimed', worker = ? WHERE product_id = ?",
+                [(worker_id, pid) for pid in ids]
+            )
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        return ids
+
+    def mark_done(self, product_ids):
+        self.conn.execute('BEGIN')
+        self.conn.executemany(
+            "UPDATE tasks SET status = 'done' WHERE product_id = ?",
+            [(str(pid),) for pid in product_ids]
+        )
+        self.conn.execute('COMMIT')
+
+    def release_claimed(self):
+        """把上次运行中领取但未完成的任务放回队列"""
+        self.conn.execute("UPDATE tasks SET status = 'pending', worker = NULL WHERE status = 'claimed'")
+
+    def counts(self):
+        return dict(self.conn.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status').fetchall())
+
+    def close(self):
+        self.conn.close()
+
+
+class SharedRateLimiter:
+    """
+    所有工作进程共用的按主机限速器
+
+    每个主机下一次可以发请求的时间保存在任务队列所在的 SQLite 文件中，进程在事务内领取时间片，
+    合计速率不超过配置的每秒请求数，各进程的随机等待和页面解析仍然并行
+    """
+
+    def __init__(self, db_path, rates, default_rate):
+        """
+        参数:
+            db_path (str): SQLite 文件路径，通常与 WorkQueue 相同
+            rates (dict): 主机 -> 所有进程合计的每秒请求数
+            default_rate (float): 未配置主机的每秒请求数
+        """
+        self.rates = rates
+        self.default_rate = default_rate
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS rate_slots (
+                host      TEXT PRIMARY KEY,
+                next_time REAL NOT NULL
+            )
+        ''')
+
+    def reserve(self, host):
+        """领取该主机的下一个时间片，返回需要等待的秒数"""
+        interval = 1.0 / self.rates.get(host, self.default_rate)
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = self.conn.execute('SELECT next_time FROM rate_slots WHERE host = ?', (host,)).fetchone()
+            now = time.time()
+            slot = max(now, row[0]) if row else now
+            self.conn.execute('INSERT OR REPLACE INTO rate_slots (host, next_time) VALUES (?, ?)',
+                              (host, slot + interval))
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        return slot - now
+
+    def close(self):
+        self.conn.close()
+
+
+def _iter_journal(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # 中断时写了一半的行
+                break
+
+
+def _claimed_ids(queue, worker_id, chunk_size):
+    while True:
+        batch = queue.claim(worker_id, chunk_size)
+        if not batch:
+            return
+        yield from batch
+
+
+def _run_shard(worker_id, workers, work_dir, crawler_kwargs, use_async, chunk_size):
+    """工作进程入口：不断从队列领取任务，结果写入本分片的文件"""
+    crawler_kwargs = dict(crawler_kwargs)
+    shared_limiter = None
+    if use_async:
+        # 异步模式下每个主机的并发数和速率由所有工作进程平分
+        crawler_kwargs.setdefault('rate_share', 1.0 / workers)
+    else:
+        # 同步模式下各进程照常随机等待，合计速率由共用的限速器控制
+        host_limits = dict(AsyncJDPriceCrawler.DEFAULT_HOST_LIMITS)
+        host_limits.update(crawler_kwargs.pop('host_limits', None) or {})
+        default_limit = crawler_kwargs.pop('default_limit', (4, 2.0))
+        shared_limiter = SharedRateLimiter(os.path.join(work_dir, 'queue.db'),
+                                           {host: rate for host, (_, rate) in host_limits.items()},
+                                           default_limit[1])
+        crawler_kwargs['shared_limiter'] = shared_limiter
+    # 缓存对象不能跨进程传递，按文件路径在子进程中重新打开
+    title_ttl = crawler_kwargs.pop('title_ttl', 7 * 24 * 3600)
+    if crawler_kwargs.get('title_cache'):
+        crawler_kwargs['title_cache'] = SkuTitleCache(crawler_kwargs['title_cache'], ttl=title_ttl)
+    if crawler_kwargs.get('http_cache'):
+        crawler_kwargs['http_cache'] = HttpCache(crawler_kwargs['http_cache'])
+    if crawler_kwargs.get('price_history'):
+        crawler_kwargs['price_history'] = PriceHistoryStore(crawler_kwargs['price_history'])
+
+    shard = os.path.join(work_dir, f'shard_{worker_id}')
+    crawler_kwargs.setdefault('metrics_path', shard + '_metrics.json')
+
+    crawler_cls = AsyncJDPriceCrawler if use_async else JDPriceCrawler
+    crawler = crawler_cls(**crawler_kwargs)
+
+    queue = WorkQueue(os.path.join(work_dir, 'queue.db'))
+    try:
+        crawler.crawl_products(
+            _claimed_ids(queue, worker_id, chunk_size),
+            output_csv=shard + '.csv',
+            output_json=shard + '.json',
+            journal_path=shard + '.jsonl',
+            resume=True
+        )
+    finally:
+        queue.close()
+        if shared_limiter is not None:
+            shared_limiter.close()
+        for cache in (crawler.title_cache, crawler.http_cache, crawler.price_history):
+            if cache is not None:
+                cache.close()
+
+
+def merge_shards(work_dir, output_csv='jd_prices.csv', output_json='jd_prices.json'):
+    """
+    把各分片的日志合并到最终的 CSV 和 JSON 文件，返回合并的商品数
+
+    output_csv 和单进程模式一样只追加、不覆盖，保留以前运行的历史记录。
+    已经追加过的商品记录在 work_dir/merged.jsonl 中，续爬后重复合并时只追加新完成的商品；
+    JSON 文件由 merged.jsonl 重新导出，包含本次任务的全部结果
+    """
+    journal_path = os.path.join(work_dir, 'merged.jsonl')
+
+    with CrawlJournal(journal_path, output_csv, JDPriceCrawler.FIELDNAMES, resume=True) as journal:
+        for shard_journal in sorted(glob.glob(os.path.join(work_dir, 'shard_*.jsonl'))):
+            for record in _iter_journal(shard_journal):
+                if not journal.is_done(record['product_id']):
+                    journal.record(record)
+        journal.export_json(output_json)
+        return len(journal.done)
+
+
+def crawl_sharded(product_ids, workers=None, output_csv='jd_prices.csv', output_json='jd_prices.json',
+                  work_dir='jd_shards', resume=False, use_async=False, chunk_size=200, crawler_kwargs=None):
+    """
+    多进程分片爬取
+
+    参数:
+        product_ids (iterable): 商品ID，可以是生成器
+        workers (int): 工作进程数，默认为 CPU 核数
+        output_csv (str): 合并后的 CSV 文件
+        output_json (str): 合并后的 JSON 文件
+        work_dir (str): 任务队列和分片输出目录
+        resume (bool): 是否继续上次未完成的任务
+        use_async (bool): 每个工作进程内部是否使用异步并发模式
+        chunk_size (int): 每次从队列领取的任务数
+        crawler_kwargs (dict): 传给爬虫构造函数的参数，title_cache / http_cache / price_history 传文件路径，
+            title_ttl 为标题缓存有效期（秒）；host_limits 是所有工作进程合计的预算，同步模式下
+            各进程共用 SharedRateLimiter 控制合计速率，异步模式下并发数和速率按 1 / workers 分摊，
+            每个进程至少 1 个并发
+
+    返回:
+        int: 合并的商品数
+
+    有工作进程异常退出时，合并已完成的部分结果后抛出 RuntimeError
+    """
+    workers = workers or os.cpu_count() or 1
+    crawler_kwargs = crawler_kwargs or {}
+
+    if not resume and os.path.exists(work_dir):
+        shutil.rmtree(work_dir)
+    os.makedirs(work_dir, exist_ok=True)
+
+    queue = WorkQueue(os.path.join(work_dir, 'queue.db'))
+    if resume:
+        # 已写入分片日志的商品视为完成，其余领取过的任务重新排队
+        for shard_journal in glob.glob(os.path.join(work_dir, 'shard_*.jsonl')):
+            queue.mark_done(record['product_id'] for record in _iter_journal(shard_journal))
+        queue.release_claimed()
+    queue.add(product_ids)
+    logger.info(f"任务队列状态: {queue.counts()}")
+    queue.close()
+
+    if use_async:
+        host_limits = dict(AsyncJDPriceCrawler.DEFAULT_HOST_LIMITS)
+        host_limits.update(crawler_kwargs.get('host_limits') or {})
+        for host, (concurrency, _) in host_limits.items():
+            if workers > concurrency:
+                logger.warning(f"{host} 的并发预算为 {concurrency}，{workers} 个进程每个至少 1 个并发，"
+                               f"合计并发为 {workers}")
+
+    processes = [
+        multiprocessing.Process(
+            target=_run_shard,
+            args=(worker_id, workers, work_dir, crawler_kwargs, use_async, chunk_size)
+        )
+        for worker_id in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    # 即使有工作进程失败也合并已完成的结果，再用 resume 继续剩余的任务
+    total = merge_shards(work_dir, output_csv, output_json)
+    failed = {worker_id: process.exitcode for worker_id, process in enumerate(processes) if process.exitcode != 0}
+    if failed:
+        details = '，'.join(f"分片 {worker_id} 退出码 {code}" for worker_id, code in failed.items())
+        logger.error(f"{len(failed)} 个工作进程异常退出（{details}），已合并 {total} 个商品的部分结果，"
+                     f"请使用 resume 继续未完成的任务")
+        raise RuntimeError(f"分片爬取未完成: {details}")
+
+    logger.info(f"分片爬取完成，共 {total} 个商品，CSV 保存至 {output_csv}，JSON 保存至 {output_json}")
+    return total
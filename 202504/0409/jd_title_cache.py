@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+京东商品标题缓存。
+
+商品标题几乎不变，而价格每次都可能变化。把标题持久化到 SQLite 后，
+重复爬取时只需请求轻量的价格接口，只有新商品或缓存过期的商品才下载完整的商品页面。
+"""
+
+import sqlite3
+import sys
+import time
+
+
+class SkuTitleCache:
+    """基于 SQLite 的 SKU 标题缓存，支持过期时间（TTL）和手动失效"""
+
+    def __init__(self, db_path='jd_titles.db', ttl=7 * 24 * 3600):
+        """
+        初始化缓存
+
+        参数:
+            db_path (str): SQLite 数据库文件路径
+            ttl (float): 缓存有效期（秒），超过后重新抓取商品页面
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS sku_meta (
+                product_id TEXT PRIMARY KEY,
+                title      TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        self.conn.commit()
+
+    def get(self, product_id):
+        """返回未过期的标题，不存在或已过期时返回 None"""
+        row = self.conn.execute(
+            'SELECT title FROM sku_meta WHERE product_id = ? AND updated_at >= ?',
+            (str(product_id), time.time() - self.ttl)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, product_ids):
+        """批量查询，返回 {product_id: title}，只包含未过期的条目"""
+        product_ids = [str(pid) for pid in product_ids]
+        titles = {}
+        # SQLite 单条语句的参数个数有限，分块查询
+        for i in range(0, len(product_ids), 500):
+            chunk = product_ids[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f'SELECT product_id, title FROM sku_meta '
+                f'WHERE product_id IN ({placeholders}) AND updated_at >= ?',
+                (*chunk, time.time() - self.ttl)
+            ).fetchall()
+            titles.update(rows)
+        return titles
+
+    def set(self, product_id, title):
+        self.set_many({product_id: title})
+
+    def set_many(self, titles):
+        now = time.time()
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO sku_meta (product_id, title, updated_at) VALUES (?, ?, ?)',
+            [(str(pid), title, now) for pid, title in titles.items()]
+        )
+        self.conn.commit()
+
+    def invalidate(self, product_ids=None):
+        """使指定商品的缓存失效；不传参数时清空全部缓存"""
+        if product_ids is None:
+            self.conn.execute('DELETE FROM sku_meta')
+        else:
+            self.conn.executemany(
+                'DELETE FROM sku_meta WHERE product_id = ?',
+                [(str(pid),) for pid in product_ids]
+            )
+        self.conn.commit()
+
+    def purge_expired(self):
+        """删除所有过期条目，返回删除的条数"""
+        cursor = self.conn.execute(
+            'DELETE FROM sku_meta WHERE updated_at < ?', (time.time() - self.ttl,)
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+if __name__ == "__main__":
+    # 用法: python jd_title_cache.py [数据库文件] [要失效的商品ID ...]
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'jd_titles.db'
+    with SkuTitleCache(db_path) as cache:
+        if len(sys.argv) > 2:
+            cache.invalidate(sys.argv[2:])
+            print(f"已使 {len(sys.argv) - 2} 个商品的标题缓存失效")
+        else:
+            print(f"已清理 {cache.purge_expired()} 条过期缓存")
@@ -1,31 +1,117 @@
 import pandas as pd
 import numpy as np
 from tqdm import tqdm
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import argparse
+import glob
+import hashlib
 import os
 
-def load_excel_file(file_path):
-    """加载Excel文件并进行数据验证和调试"""
+from sales_excel_writer import BACKENDS as WRITER_BACKENDS, DEFAULT_ENGINE, write_sheets
+
+SUMMARY_FILE = 'sales_汇总.xlsx'
+# 解析结果缓存目录，源文件未变化时直接读取缓存
+CACHE_DIR = '.sales_cache'
+# 流式读取时每块的行数
+CHUNK_SIZE = 50000
+# 按日期汇总的工作表名和对应的周期
+ROLLUPS = {'按日汇总': 'D', '按周汇总': 'W', '按月汇总': 'M'}
+
+def _clean_sales_data(df, file_path):
+    """转换销售额、过滤无效行并添加来源标记，返回 (清洗后的数据, 格式错误行数, 无效行数)"""
+    # ✅ 调试技巧 3：强制转换金额字段，防止格式错误
+    raw = df['销售额']
+    df['销售额'] = pd.to_numeric(raw, errors='coerce')
+    malformed = int((df['销售额'].isna() & raw.notna()).sum())
+
+    # ✅ 过滤掉负值和 NaN 销售额
+    valid = df['销售额'].notna() & (df['销售额'] >= 0)
+    invalid = int((~valid).sum())
+    if invalid:
+        df = df[valid]
+
+    # ✅ 调试技巧 2：添加来源标记
+    city_name = os.path.basename(file_path).split('_')[1].split('.')[0]
+    df['城市'] = city_name
+    df['来源文件'] = os.path.basename(file_path)
+    return df, malformed, invalid
+
+def _report_invalid(file_path, malformed, invalid):
+    # ✅ 打印格式错误警告（可选）
+    if malformed:
+        print(f"⚠️ {file_path} 中有格式错误的销售额数据，已转换为 NaN")
+    if invalid:
+        print(f"⚠️ {os.path.basename(file_path)} 中有 {invalid} 行无效销售额（负数或NaN），已跳过")
+
+def iter_sales_chunks(file_path, chunk_size=CHUNK_SIZE, report=True):
+    """
+    以只读模式逐行读取Excel文件，按块返回清洗后的数据
+
+    openpyxl 的 read_only 模式不会为整个工作表创建单元格对象，
+    内存占用只与 chunk_size 有关，与文件行数无关
+
+    参数:
+        file_path (str): Excel文件路径
+        chunk_size (int): 每块的行数
+        report (bool): 读完后是否打印无效行的警告（同一文件第二次读取时关闭）
+
+    返回:
+        generator: 逐块产生 DataFrame
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    malformed = invalid = 0
     try:
-        # ✅ 读取 Excel 文件
-        df = pd.read_excel(file_path)
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(col) for col in header]
+
+        def flush(records):
+            chunk = pd.DataFrame.from_records(records, columns=columns)
+            return _clean_sales_data(chunk, file_path)
 
-        # ✅ 调试技巧 3：强制转换金额字段，防止格式错误
-        df['销售额'] = pd.to_numeric(df['销售额'], errors='coerce')
+        records = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            records.append(row)
+            if len(records) >= chunk_size:
+                chunk, bad_format, bad_rows = flush(records)
+                malformed += bad_format
+                invalid += bad_rows
+                records = []
+                yield chunk
+        if records:
+            chunk, bad_format, bad_rows = flush(records)
+            malformed += bad_format
+            invalid += bad_rows
+            yield chunk
+    finally:
+        workbook.close()
+        if report:
+            _report_invalid(file_path, malformed, invalid)
 
-        # ✅ 打印格式错误警告（可选）
-        if df['销售额'].isna().any():
-            print(f"⚠️ {file_path} 中有格式错误的销售额数据，已转换为 NaN")
+def load_excel_file(file_path, chunk_size=None):
+    """
+    加载Excel文件并进行数据验证和调试
 
-        # ✅ 过滤掉负值和 NaN 销售额
-        invalid_rows = df[df['销售额'].isna() | (df['销售额'] < 0)]
-        if not invalid_rows.empty:
-            print(f"⚠️ {os.path.basename(file_path)} 中有 {len(invalid_rows)} 行无效销售额（负数或NaN），已跳过")
-            df = df[df['销售额'].notna() & (df['销售额'] >= 0)]
+    chunk_size 不为 None 时使用流式读取，适合几十万行以上的大文件
+    """
+    try:
+        if chunk_size:
+            chunks = list(iter_sales_chunks(file_path, chunk_size))
+            if not chunks:
+                raise ValueError("文件中没有数据")
+            return pd.concat(chunks, ignore_index=True)
 
-        # ✅ 调试技巧 2：添加来源标记
-        city_name = os.path.basename(file_path).split('_')[1].split('.')[0]
-        df['城市'] = city_name
-        df['来源文件'] = os.path.basename(file_path)
+        # ✅ 读取 Excel 文件
+        df = pd.read_excel(file_path)
+        df, malformed, invalid = _clean_sales_data(df, file_path)
+        _report_invalid(file_path, malformed, invalid)
 
         # ✅ 调试技巧 1：在此设置断点调试并右键 → View as DataFrame
         return df
@@ -33,51 +119,328 @@ def load_excel_file(file_path):
         print(f"读取文件 {file_path} 时出错: {e}")
         return None
 
-def process_sales_data():
-    """处理销售数据并生成汇总结果"""
-    beijing_file = 'sales_北京.xlsx'
-    shanghai_file = 'sales_上海.xlsx'
+def aggregate_file_streaming(file_path, chunk_size=CHUNK_SIZE):
+    """流式读取文件并逐块计算部分和，返回 (部分和, 有效行数)，出错时返回 None"""
+    from sales_aggregate_store import partial_sums
+
+    try:
+        parts = []
+        rows = 0
+        for chunk in iter_sales_chunks(file_path, chunk_size):
+            parts.append(partial_sums(chunk))
+            rows += len(chunk)
+        if not parts:
+            raise ValueError("文件中没有数据")
+        # 各块的部分和再合并一次
+        partial = pd.concat(parts).groupby(['产品类别', '城市', '日期'], as_index=False)[['sum', 'count']].sum()
+        return partial, rows
+    except Exception as e:
+        print(f"读取文件 {file_path} 时出错: {e}")
+        return None
+
+def aggregate_daily_streaming(file_path, chunk_size=CHUNK_SIZE):
+    """流式读取文件并逐块按日聚合，返回 (按日汇总, 列名)，出错时返回 None；不保留文件的完整数据"""
+    try:
+        parts = []
+        columns = None
+        for chunk in iter_sales_chunks(file_path, chunk_size):
+            parts.append(aggregate_daily(chunk))
+            columns = list(chunk.columns)
+        if not parts:
+            raise ValueError("文件中没有数据")
+        return combine_daily(parts), columns
+    except Exception as e:
+        print(f"读取文件 {file_path} 时出错: {e}")
+        return None
+
+def iter_raw_chunks(file_paths, columns, chunk_size=CHUNK_SIZE):
+    """依次重新流式读取各文件，产出按 columns 对齐的原始数据块（与 pd.concat 的列相同）"""
+    for path in file_paths:
+        for chunk in iter_sales_chunks(path, chunk_size, report=False):
+            yield chunk.reindex(columns=columns)
+
+def _map_files(func, file_paths, max_workers=None):
+    """对每个文件调用 func，多个文件时用进程池并行"""
+    if max_workers == 1 or len(file_paths) <= 1:
+        return [func(path) for path in tqdm(file_paths, desc='解析文件')]
+    # 子进程只返回很小的汇总结果，不传回原始数据
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(tqdm(executor.map(func, file_paths), total=len(file_paths), desc='解析文件'))
+
+def _cache_paths(file_path, cache_dir, use_hash=False):
+    """返回 (该源文件所有缓存的前缀, 当前版本的缓存路径)"""
+    abs_path = os.path.abspath(file_path)
+    stat = os.stat(abs_path)
+    prefix = hashlib.sha1(abs_path.encode('utf-8')).hexdigest()[:16]
+    version = f"{stat.st_mtime_ns}-{stat.st_size}"
+    if use_hash:
+        with open(abs_path, 'rb') as f:
+            version += '-' + hashlib.sha1(f.read()).hexdigest()
+    version = hashlib.sha1(version.encode('utf-8')).hexdigest()[:16]
+    return prefix, os.path.join(cache_dir, f"{prefix}_{version}.feather")
+
+def read_cached_file(file_path, cache_dir=CACHE_DIR, use_hash=False):
+    """读取未过期的缓存，没有缓存时返回 None"""
+    _, cache_path = _cache_paths(file_path, cache_dir, use_hash)
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        import pyarrow.feather as feather
+        # 未压缩的 Feather 文件可内存映射读取
+        return feather.read_table(cache_path, memory_map=True).to_pandas()
+    except Exception as e:
+        print(f"⚠️ 读取缓存 {cache_path} 失败，将重新解析: {e}")
+        return None
+
+def load_excel_file_cached(file_path, cache_dir=CACHE_DIR, use_hash=False, chunk_size=None):
+    """解析Excel文件并把结果写入缓存，同一文件的旧缓存会被删除"""
+    df = load_excel_file(file_path, chunk_size)
+    if df is None:
+        return None
+
+    try:
+        import pyarrow.feather as feather
+
+        os.makedirs(cache_dir, exist_ok=True)
+        prefix, cache_path = _cache_paths(file_path, cache_dir, use_hash)
+        for old in glob.glob(os.path.join(cache_dir, f"{prefix}_*.feather")):
+            os.remove(old)
+        tmp_path = cache_path + '.tmp'
+        feather.write_feather(df.reset_index(drop=True), tmp_path, compression='uncompressed')
+        os.replace(tmp_path, cache_path)
+    except ImportError:
+        print("⚠️ 未安装 pyarrow，跳过解析结果缓存")
+    except Exception as e:
+        print(f"⚠️ 写入 {file_path} 的缓存失败: {e}")
+    return df
+
+def discover_sales_files(data_dir='.', pattern='sales_*.xlsx'):
+    """查找所有城市的销售文件（排除汇总结果文件）"""
+    files = sorted(glob.glob(os.path.join(data_dir, pattern)))
+    return [f for f in files if os.path.basename(f) != SUMMARY_FILE]
 
-    if not os.path.exists(beijing_file) or not os.path.exists(shanghai_file):
-        print("❌ 找不到Excel文件，请确认 sales_北京.xlsx 和 sales_上海.xlsx 是否存在")
+def load_sales_files(file_paths, max_workers=None, cache_dir=CACHE_DIR, use_hash=False, chunk_size=None):
+    """
+    用进程池并行解析多个Excel文件，返回 (DataFrame列表, 读取失败的文件列表)
+
+    cache_dir 不为 None 时，未变化的文件直接读取缓存，只有新增或修改过的文件才重新解析；
+    chunk_size 不为 None 时使用流式读取
+    """
+    frames = {}
+    if cache_dir:
+        for path in file_paths:
+            df = read_cached_file(path, cache_dir, use_hash)
+            if df is not None:
+                frames[path] = df
+        loader = partial(load_excel_file_cached, cache_dir=cache_dir, use_hash=use_hash, chunk_size=chunk_size)
+    else:
+        loader = partial(load_excel_file, chunk_size=chunk_size)
+
+    to_parse = [path for path in file_paths if path not in frames]
+    if frames:
+        print(f"📦 {len(frames)} 个文件命中缓存，{len(to_parse)} 个文件需要解析")
+
+    if max_workers == 1 or len(to_parse) <= 1:
+        parsed = [loader(path) for path in tqdm(to_parse, desc='解析文件')]
+    else:
+        # openpyxl 解析是CPU密集型的，多进程才能利用多核
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            parsed = list(tqdm(executor.map(loader, to_parse), total=len(to_parse), desc='解析文件'))
+    frames.update(zip(to_parse, parsed))
+
+    failed = [path for path in file_paths if frames[path] is None]
+    return [frames[path] for path in file_paths if frames[path] is not None], failed
+
+def process_sales_data(data_dir='.', max_workers=None, cache_dir=CACHE_DIR, chunk_size=None,
+                       writer=DEFAULT_ENGINE):
+    """处理销售数据并生成汇总结果，writer 为Excel写入后端（见 sales_excel_writer）"""
+    sales_files = discover_sales_files(data_dir)
+
+    if not sales_files:
+        print("❌ 找不到Excel文件，请确认 sales_城市.xlsx 文件是否存在")
         return
 
-    print("🔄 正在加载销售数据...")
+    print(f"🔄 正在加载 {len(sales_files)} 个城市的销售数据...")
 
-    # 加载北京数据
-    beijing_data = load_excel_file(beijing_file)
-    if beijing_data is None:
+    if chunk_size:
+        _process_sales_data_streaming(sales_files, max_workers, chunk_size, writer)
         return
 
-    # 加载上海数据
-    shanghai_data = load_excel_file(shanghai_file)
-    if shanghai_data is None:
+    frames, failed = load_sales_files(sales_files, max_workers, cache_dir)
+    if failed:
+        print(f"❌ 以下文件读取失败：{', '.join(os.path.basename(f) for f in failed)}")
         return
 
-    # 合并数据
-    combined_data = pd.concat([beijing_data, shanghai_data], ignore_index=True)
+    # 一次性合并所有城市的数据
+    combined_data = pd.concat(frames, ignore_index=True)
+
+    # 对原始数据只做一次分组聚合，透视表和按日/周/月汇总都从这个结果计算
+    daily_data = aggregate_daily(combined_data)
+    pivot_data = build_pivot(daily_data)
 
-    # 按产品类别和城市汇总销售额
-    summary_data = combined_data.groupby(['产品类别', '城市'])['销售额'].sum().reset_index()
+    # 保存结果
+    sheets = {'分析结果': pivot_data, **build_rollups(daily_data), '原始数据': combined_data}
+    write_sheets(SUMMARY_FILE, sheets, engine=writer)
+
+    print("✅ 汇总完成！结果已保存为 sales_汇总.xlsx")
+    print("\n📊 汇总结果预览：")
+    print(pivot_data)
 
-    # 创建数据透视表
-    pivot_data = summary_data.pivot(index='产品类别', columns='城市', values='销售额').reset_index()
+def _process_sales_data_streaming(sales_files, max_workers, chunk_size, writer):
+    """
+    全量汇总的流式版本，内存占用与文件大小无关
 
-    # 添加总计列
-    pivot_data['总计'] = pivot_data[['北京', '上海']].sum(axis=1)
+    第一遍逐块按日聚合（多进程），第二遍重新逐块读取各文件，直接写入“原始数据”工作表，
+    不合并成一个 DataFrame；代价是每个文件解析两次，且不使用解析缓存
+    """
+    results = _map_files(partial(aggregate_daily_streaming, chunk_size=chunk_size), sales_files, max_workers)
+    failed = [path for path, result in zip(sales_files, results) if result is None]
+    if failed:
+        print(f"❌ 以下文件读取失败：{', '.join(os.path.basename(f) for f in failed)}")
+        return
 
-    # 保留两位小数
-    for col in ['北京', '上海', '总计']:
-        pivot_data[col] = pivot_data[col].round(2)
+    daily_data = combine_daily([daily for daily, _ in results])
+    pivot_data = build_pivot(daily_data)
+    # 与 pd.concat 一样按出现顺序合并各文件的列
+    columns = list(dict.fromkeys(column for _, file_columns in results for column in file_columns))
 
-    # 保存结果
-    with pd.ExcelWriter('sales_汇总.xlsx', engine='openpyxl') as writer:
-        pivot_data.to_excel(writer, sheet_name='分析结果', index=False)
-        combined_data.to_excel(writer, sheet_name='原始数据', index=False)
+    sheets = {'分析结果': pivot_data, **build_rollups(daily_data),
+              '原始数据': iter_raw_chunks(sales_files, columns, chunk_size)}
+    write_sheets(SUMMARY_FILE, sheets, engine=writer)
 
     print("✅ 汇总完成！结果已保存为 sales_汇总.xlsx")
     print("\n📊 汇总结果预览：")
     print(pivot_data)
 
+def process_sales_data_incremental(data_dir='.', max_workers=None, cache_dir=CACHE_DIR,
+                                   store_path='sales_aggregates.db', chunk_size=None, writer=DEFAULT_ENGINE):
+    """
+    增量汇总：只解析新增或修改过的文件，把它们的部分和合入持久化的汇总库
+
+    汇总结果只包含“分析结果”和按日/周/月汇总，不再重写全部原始数据。
+    chunk_size 不为 None 时逐块读取并累加部分和，不保留文件的完整数据，也不写解析缓存
+    """
+    from sales_aggregate_store import SalesAggregateStore
+
+    sales_files = discover_sales_files(data_dir)
+
+    with SalesAggregateStore(store_path) as store:
+        removed = store.remove_missing(sales_files)
+        if removed:
+            print(f"🗑️ {removed} 个已删除文件的数据已从汇总中移除")
+
+        changed = store.changed_files(sales_files)
+        print(f"🔄 共 {len(sales_files)} 个销售文件，其中 {len(changed)} 个是新增或修改过的")
+
+        if changed and chunk_size:
+            results = _map_files(partial(aggregate_file_streaming, chunk_size=chunk_size), changed, max_workers)
+            failed = [path for path, result in zip(changed, results) if result is None]
+            if failed:
+                print(f"❌ 以下文件读取失败，本次不更新它们：{', '.join(os.path.basename(f) for f in failed)}")
+            for path, result in zip(changed, results):
+                if result is not None:
+                    store.replace_partial(path, *result, commit=False)
+            store.commit()
+        elif changed:
+            frames, failed = load_sales_files(changed, max_workers, cache_dir)
+            if failed:
+                print(f"❌ 以下文件读取失败，本次不更新它们：{', '.join(os.path.basename(f) for f in failed)}")
+            loaded = [path for path in changed if path not in failed]
+            for path, df in zip(loaded, frames):
+                store.replace_file(path, df, commit=False)
+            store.commit()
+
+        summary_data = store.category_city_totals()
+        daily_data = store.daily_totals()
+
+    if summary_data.empty:
+        print("❌ 汇总库中没有数据，请确认 sales_城市.xlsx 文件是否存在")
+        return
+
+    pivot_data = build_pivot(summary_data)
+
+    sheets = {'分析结果': pivot_data, **build_rollups(daily_data)}
+    write_sheets(SUMMARY_FILE, sheets, engine=writer)
+
+    print("✅ 增量汇总完成！结果已保存为 sales_汇总.xlsx")
+    print("\n📊 汇总结果预览：")
+    print(pivot_data)
+
+def aggregate_daily(data):
+    """
+    对原始数据做一次分组聚合，得到 (产品类别, 城市, 日期) 粒度的销售额
+
+    之后的透视表和各周期汇总都在这个结果上计算，不再扫描原始数据。
+    没有日期列时只按 (产品类别, 城市) 聚合
+    """
+    keys = ['产品类别', '城市']
+    if '日期' in data.columns:
+        data = data.assign(日期=pd.to_datetime(data['日期'], errors='coerce').dt.normalize())
+        keys.append('日期')
+    # 日期缺失的行也要计入总计
+    return data.groupby(keys, dropna=False)['销售额'].sum().reset_index()
+
+def combine_daily(parts):
+    """合并多块 aggregate_daily 的结果，与对合并后的原始数据调用 aggregate_daily 相同"""
+    combined = pd.concat(parts, ignore_index=True)
+    keys = [key for key in ('产品类别', '城市', '日期') if key in combined.columns]
+    return combined.groupby(keys, dropna=False)['销售额'].sum().reset_index()
+
+def _margins_pivot(data, index):
+    """按城市分列透视，城市数量不固定，同时生成总计行和总计列"""
+    pivot_data = data.pivot_table(index=index, columns='城市', values='销售额', aggfunc='sum',
+                                  margins=True, margins_name='总计')
+    # 保留两位小数
+    return pivot_data.round(2).reset_index()
+
+def build_pivot(summary_data):
+    """把 (产品类别, 城市, 销售额) 的汇总（可以是按日的部分和）转换为按城市分列的透视表，带总计行和总计列"""
+    return _margins_pivot(summary_data, '产品类别')
+
+def build_rollups(daily_data):
+    """
+    从按日部分和计算按日/周/月的城市汇总
+
+    返回:
+        dict: 工作表名 → 透视表，没有日期数据时为空字典
+    """
+    if '日期' not in daily_data.columns:
+        return {}
+    dates = pd.to_datetime(daily_data['日期'], errors='coerce')
+    dated = daily_data[dates.notna()]
+    if dated.empty:
+        return {}
+    dates = dates[dates.notna()]
+
+    rollups = {}
+    for sheet_name, freq in ROLLUPS.items():
+        # 周期转为字符串（如 2025-04-09、2025-04-07/2025-04-13、2025-04），排序即时间顺序
+        periods = dates.dt.to_period(freq).astype(str)
+        rollups[sheet_name] = _margins_pivot(dated.assign(周期=periods.values), '周期')
+    return rollups
+
+def main():
+    parser = argparse.ArgumentParser(description='汇总各城市销售数据')
+    parser.add_argument('--data-dir', default='.', help='sales_城市.xlsx 文件所在目录')
+    parser.add_argument('--workers', type=int, default=None, help='解析文件的进程数，默认为 CPU 核数')
+    parser.add_argument('--no-cache', action='store_true', help='不使用解析结果缓存')
+    parser.add_argument('--incremental', action='store_true',
+                        help='增量模式：只处理新增或修改过的文件，部分和保存在 --store 指定的数据库中')
+    parser.add_argument('--store', default='sales_aggregates.db', help='增量模式的汇总数据库文件')
+    parser.add_argument('--stream', action='store_true',
+                        help='以只读模式逐块读取Excel文件，内存与文件大小无关，适合大文件；'
+                             '全量模式下每个文件解析两次（先汇总，再写入原始数据），不使用解析缓存')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='流式读取时每块的行数')
+    parser.add_argument('--writer', default=DEFAULT_ENGINE, choices=list(WRITER_BACKENDS),
+                        help='Excel写入后端，pandas 为原来的 openpyxl 写法')
+    args = parser.parse_args()
+
+    cache_dir = None if args.no_cache else CACHE_DIR
+    chunk_size = args.chunk_size if args.stream else None
+    if args.incremental:
+        process_sales_data_incremental(args.data_dir, args.workers, cache_dir, args.store, chunk_size, args.writer)
+    else:
+        process_sales_data(args.data_dir, args.workers, cache_dir, chunk_size, args.writer)
+
 if __name__ == "__main__":
-    process_sales_data()
+    main()
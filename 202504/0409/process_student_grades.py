@@ -3,12 +3,16 @@
 
 """
 这个脚本读取学生成绩文件，将数据存储到字典中，并计算每个学生的成绩及班级平均成绩。
+
+文件太大时使用 --stream：分块读取并累计统计，内存占用固定，只输出班级统计，不列出每名学生。
+注意：--stream 不保存姓名，重名的学生每一行都计入统计；普通模式下同名学生只保留最后一条成绩。
 """
 
+import argparse
 import csv
 import os
-import sys
-import statistics
+
+from grade_stats import summarize, summarize_csv
 
 def read_student_grades(filename):
     """
@@ -64,26 +68,81 @@ def calculate_statistics(student_grades):
     if not student_grades:
         return None
     
-    grades = list(student_grades.values())
+    summary = summarize(list(student_grades.values()), percentiles=(), at_least=())
     
     stats = {
-        'count': len(student_grades),
-        'total': sum(grades),
-        'average': statistics.mean(grades),
-        'median': statistics.median(grades),
-        'min': min(grades),
-        'max': max(grades)
+        'count': summary['count'],
+        'total': summary['total'],
+        'average': summary['mean'],
+        'median': summary['median'],
+        'min': summary['min'],
+        'max': summary['max']
     }
     
     return stats
 
-def display_results(filename):
+def calculate_statistics_streaming(filename, chunk_size=100000):
+    """
+    分块读取成绩文件并计算班级统计信息，不把成绩保存到字典中
+
+    整数成绩的结果与 calculate_statistics 相同；重名的学生不会去重，每一行都计入统计
+
+    参数:
+        filename (str): 包含学生成绩的文件名
+        chunk_size (int): 每次读取的行数
+
+    返回:
+        dict: 包含统计信息的字典
+    """
+    if not os.path.exists(filename):
+        print(f"错误: 文件 '{filename}' 不存在!")
+        return None
+
+    try:
+        summary = summarize_csv(filename, chunk_size=chunk_size, integer_only=True, percentiles=(), at_least=())
+    except ValueError as e:
+        print(f"错误: 文件包含非数字成绩: {e}")
+        return None
+    except Exception as e:
+        print(f"错误: 读取文件时发生错误: {e}")
+        return None
+
+    if summary['count'] == 0:
+        return None
+
+    return {
+        'count': summary['count'],
+        'total': summary['total'],
+        'average': summary['mean'],
+        'median': summary['median'],
+        'min': summary['min'],
+        'max': summary['max']
+    }
+
+def _print_statistics(filename, stats):
+    print(f"\n文件 '{filename}' 的分析结果:")
+    print(f"学生人数: {stats['count']}")
+    print(f"成绩总和: {stats['total']}")
+    print(f"班级平均成绩: {stats['average']:.2f}")
+    print(f"中位成绩: {stats['median']:.2f}")
+    print(f"最低成绩: {stats['min']}")
+    print(f"最高成绩: {stats['max']}")
+
+def display_results(filename, stream=False, chunk_size=100000):
     """
     显示分析结果
     
     参数:
         filename (str): 包含学生成绩的文件名
+        stream (bool): 是否分块读取，只显示班级统计
+        chunk_size (int): 分块读取时每块的行数
     """
+    if stream:
+        stats = calculate_statistics_streaming(filename, chunk_size)
+        if stats is not None:
+            _print_statistics(filename, stats)
+        return
+
     # 读取学生成绩
     student_grades = read_student_grades(filename)
     
@@ -96,13 +155,7 @@ def display_results(filename):
     if stats is None:
         return
     
-    print(f"\n文件 '{filename}' 的分析结果:")
-    print(f"学生人数: {stats['count']}")
-    print(f"成绩总和: {stats['total']}")
-    print(f"班级平均成绩: {stats['average']:.2f}")
-    print(f"中位成绩: {stats['median']:.2f}")
-    print(f"最低成绩: {stats['min']}")
-    print(f"最高成绩: {stats['max']}")
+    _print_statistics(filename, stats)
     
     # 显示所有学生成绩
     print("\n学生成绩列表:")
@@ -123,11 +176,12 @@ def display_results(filename):
         print(f"{i}\t{name}\t{grade}")
 
 if __name__ == "__main__":
-    # 默认文件名
-    filename = "student_grades.csv"
-    
-    # 如果提供了命令行参数，使用它作为文件名
-    if len(sys.argv) > 1:
-        filename = sys.argv[1]
-    
-    display_results(filename) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='学生成绩统计')
+    parser.add_argument('filename', nargs='?', default='student_grades.csv', help='学生成绩文件')
+    parser.add_argument('--stream', action='store_true',
+                        help='分块读取大文件，只显示班级统计。注意：不按姓名去重，重名学生的每一行都计入统计，'
+                             '普通模式只保留同名学生的最后一条成绩，姓名不唯一时两种模式结果不同')
+    parser.add_argument('--chunk-size', type=int, default=100000, help='分块读取时每块的行数')
+    args = parser.parse_args()
+    
+    display_results(args.filename, args.stream, args.chunk_size) 
\ No newline at end of file
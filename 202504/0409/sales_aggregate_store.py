@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+销售额增量汇总库。
+
+按 (来源文件, 产品类别, 城市, 日期) 保存销售额的部分和，并记录每个来源文件的
+修改时间和大小。每次运行只需要解析新增或修改过的文件，用它们的部分和替换旧值，
+再对部分和表做一次 GROUP BY 得到汇总，耗时与新数据量成正比，不随历史数据增长。
+"""
+
+import os
+import sqlite3
+
+import pandas as pd
+
+
+def partial_sums(df):
+    """按 (产品类别, 城市, 日期) 计算销售额的和与行数，日期统一为 YYYY-MM-DD 字符串"""
+    if '日期' in df.columns:
+        dates = pd.to_datetime(df['日期'], errors='coerce').dt.strftime('%Y-%m-%d').fillna('')
+    else:
+        dates = pd.Series('', index=df.index)
+    return (df.assign(日期=dates)
+            .groupby(['产品类别', '城市', '日期'])['销售额']
+            .agg(['sum', 'count'])
+            .reset_index())
+
+
+def _file_version(file_path):
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class SalesAggregateStore:
+    """基于 SQLite 的销售额部分和存储"""
+
+    def __init__(self, db_path='sales_aggregates.db'):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS source_files (
+                source   TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size     INTEGER NOT NULL,
+                rows     INTEGER NOT NULL
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS partial_sums (
+                source   TEXT NOT NULL,
+                category TEXT NOT NULL,
+                city     TEXT NOT NULL,
+                date     TEXT NOT NULL,
+                amount   REAL NOT NULL,
+                rows     INTEGER NOT NULL,
+                PRIMARY KEY (source, category, city, date)
+            ) WITHOUT ROWID
+        ''')
+        self.conn.commit()
+
+    def changed_files(self, file_paths):
+        """返回新增或修改过（修改时间或大小变化）的文件"""
+        known = {source: (mtime_ns, size) for source, mtime_ns, size in
+                 self.conn.execute('SELECT source, mtime_ns, size FROM source_files')}
+        return [path for path in file_paths
+                if known.get(os.path.abspath(path)) != _file_version(path)]
+
+    def remove_missing(self, file_paths):
+        """删除已不存在的来源文件的部分和，返回删除的文件数"""
+        current = {os.path.abspath(path) for path in file_paths}
+        missing = [source for (source,) in self.conn.execute('SELECT source FROM source_files')
+                   if source not in current]
+        for source in missing:
+            self._delete_source(source)
+        self.conn.commit()
+        return len(missing)
+
+    def replace_file(self, file_path, df, commit=True):
+        """
+        用一个文件的最新数据替换它的部分和
+
+        参数:
+            file_path (str): 来源文件路径
+            df (DataFrame): 该文件经过验证的数据，包含 产品类别 / 城市 / 销售额，可选 日期
+            commit (bool): 是否立即提交
+
+        返回:
+            int: 写入的部分和行数
+        """
+        return self.replace_partial(file_path, partial_sums(df), len(df), commit)
+
+    def replace_partial(self, file_path, partial, rows, commit=True):
+        """
+        用已经算好的部分和替换一个文件的旧值
+
+        参数:
+            file_path (str): 来源文件路径
+            partial (DataFrame): partial_sums() 的结果，列为 产品类别 / 城市 / 日期 / sum / count
+            rows (int): 该文件的有效行数
+            commit (bool): 是否立即提交
+
+        返回:
+            int: 写入的部分和行数
+        """
+        source = os.path.abspath(file_path)
+        self._delete_source(source)
+        self.conn.executemany(
+            'INSERT INTO partial_sums (source, category, city, date, amount, rows) VALUES (?, ?, ?, ?, ?, ?)',
+            ((source, str(category), str(city), date, float(amount), int(count))
+             for category, city, date, amount, count in partial.itertuples(index=False))
+        )
+        mtime_ns, size = _file_version(file_path)
+        self.conn.execute(
+            'INSERT INTO source_files (source, mtime_ns, size, rows) VALUES (?, ?, ?, ?)',
+            (source, mtime_ns, size, rows)
+        )
+        if commit:
+            self.conn.commit()
+        return len(partial)
+
+    def _delete_source(self, source):
+        self.conn.execute('DELETE FROM partial_sums WHERE source = ?', (source,))
+        self.conn.execute('DELETE FROM source_files WHERE source = ?', (source,))
+
+    def category_city_totals(self):
+        """按产品类别和城市汇总销售额，返回 DataFrame（产品类别, 城市, 销售额）"""
+        return pd.read_sql_query(
+            'SELECT category AS 产品类别, city AS 城市, SUM(amount) AS 销售额 '
+            'FROM partial_sums GROUP BY category, city ORDER BY category, city',
+            self.conn
+        )
+
+    def daily_totals(self):
+        """按产品类别、城市和日期返回销售额部分和"""
+        return pd.read_sql_query(
+            'SELECT category AS 产品类别, city AS 城市, date AS 日期, SUM(amount) AS 销售额, SUM(rows) AS 行数 '
+            'FROM partial_sums GROUP BY category, city, date ORDER BY date, category, city',
+            self.conn
+        )
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+销售汇总结果的 Excel 写入。
+
+pandas 的 to_excel（openpyxl 引擎）会为每个单元格创建对象并在内存中保留整个工作簿，
+几十万行的原始数据写入很慢。write_only 后端使用 openpyxl 的只写模式逐行写出，
+xlsxwriter 后端使用 constant_memory 模式，两者的内存占用都与行数无关。
+"""
+
+import pandas as pd
+
+# 每次转换为 Python 对象的行数
+ROW_CHUNK = 10000
+# 默认写入后端，未安装 xlsxwriter 时 write_sheets 回退到 write_only
+DEFAULT_ENGINE = 'xlsxwriter'
+
+
+def _iter_frames(data):
+    """data 可以是 DataFrame，也可以是逐块产生 DataFrame 的可迭代对象"""
+    if isinstance(data, pd.DataFrame):
+        yield data
+    else:
+        yield from data
+
+
+def _iter_rows(frame):
+    """逐行产生单元格值，NaN / NaT 转为 None（空单元格）"""
+    for start in range(0, len(frame), ROW_CHUNK):
+        chunk = frame.iloc[start:start + ROW_CHUNK].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        yield from chunk.itertuples(index=False, name=None)
+
+
+def write_sheets_pandas(path, sheets):
+    """原来的写法：pandas.ExcelWriter + openpyxl"""
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        for sheet_name, data in sheets.items():
+            frames = list(_iter_frames(data))
+            frame = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+            frame.to_excel(writer, sheet_name=sheet_name, index=False)
+
+
+def write_sheets_write_only(path, sheets):
+    """openpyxl 只写模式，逐行写出"""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    workbook = Workbook(write_only=True)
+    bold = Font(bold=True)
+    for sheet_name, data in sheets.items():
+        worksheet = workbook.create_sheet(sheet_name)
+        header_written = False
+        for frame in _iter_frames(data):
+            if not header_written:
+                header = []
+                for name in frame.columns:
+                    cell = WriteOnlyCell(worksheet, value=str(name))
+                    cell.font = bold
+                    header.append(cell)
+                worksheet.append(header)
+                header_written = True
+            for row in _iter_rows(frame):
+                worksheet.append(row)
+    workbook.save(path)
+
+
+def write_sheets_xlsxwriter(path, sheets):
+    """xlsxwriter constant_memory 模式，写完一行就刷到临时文件"""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {
+        'constant_memory': True,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+    })
+    bold = workbook.add_format({'bold': True})
+    try:
+        for sheet_name, data in sheets.items():
+            worksheet = workbook.add_worksheet(sheet_name)
+            row_index = 0
+            for frame in _iter_frames(data):
+                if row_index == 0:
+                    worksheet.write_row(0, 0, [str(name) for name in frame.columns], bold)
+                    row_index = 1
+                for row in _iter_rows(frame):
+                    worksheet.write_row(row_index, 0, row)
+                    row_index += 1
+    finally:
+        workbook.close()
+
+
+BACKENDS = {
+    'pandas': write_sheets_pandas,
+    'write_only': write_sheets_write_only,
+    'xlsxwriter': write_sheets_xlsxwriter,
+}
+
+
+def write_sheets(path, sheets, engine=DEFAULT_ENGINE):
+    """
+    把多个工作表写入一个Excel文件
+
+    参数:
+        path (str): 输出文件路径
+        sheets (dict): 工作表名 → DataFrame（或逐块产生 DataFrame 的可迭代对象），按顺序写入
+        engine (str): 写入后端，可选 pandas / write_only / xlsxwriter，默认 DEFAULT_ENGINE；
+            xlsxwriter 未安装时回退到 write_only
+    """
+    if engine == 'xlsxwriter':
+        try:
+            import xlsxwriter  # noqa: F401
+        except ImportError:
+            print("⚠️ 未安装 xlsxwriter，改用 openpyxl 只写模式")
+            engine = 'write_only'
+    BACKENDS[engine](path, sheets)
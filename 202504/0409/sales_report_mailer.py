@@ -1,12 +1,20 @@
 import smtplib
 import os
+import numpy as np
 import pandas as pd
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import dotenv
 
+# 默认使用QQ邮箱SMTP服务器，可通过 EMAIL_HOST / EMAIL_PORT / EMAIL_SSL 修改（如本地测试服务器）
+DEFAULT_HOST = 'smtp.qq.com'
+DEFAULT_PORT = 465
+
+_email_config = None
+
 def load_sales_data():
     """加载销售汇总数据"""
     try:
@@ -17,92 +25,212 @@ def load_sales_data():
         print(f"读取销售数据时出错: {e}")
         return None
 
-def create_html_table(df):
-    """将DataFrame转换为HTML表格"""
-    # 设置表格样式
-    html_style = """
-    <style>
-        table {
-            border-collapse: collapse;
-            width: 100%;
-            margin: 20px 0;
-        }
-        th, td {
-            border: 1px solid #ddd;
-            padding: 8px;
-            text-align: right;
-        }
-        th {
-            background-color: #f2f2f2;
-            text-align: center;
-        }
-        tr:nth-child(even) {
-            background-color: #f9f9f9;
-        }
-        .total-row {
-            font-weight: bold;
-            background-color: #e6f2ff;
-        }
-    </style>
+# 表格样式，所有单元格共用几个 class，不写行内样式
+HTML_STYLE = (
+    "<style>"
+    ".sales-table{border-collapse:collapse;width:100%;margin:20px 0}"
+    ".sales-table th,.sales-table td{border:1px solid #ddd;padding:8px;text-align:right}"
+    ".sales-table th{background:#f2f2f2;text-align:center}"
+    ".sales-table tr:nth-child(even){background:#f9f9f9}"
+    ".sales-table .total-row{font-weight:bold;background:#e6f2ff}"
+    ".table-note{color:#666;font-size:13px}"
+    "</style>"
+)
+
+# 邮件中最多显示的行数，超出部分请查看附件
+MAX_HTML_ROWS = 50
+
+def format_amounts(series):
+    """把数值列格式化为带千位分隔符和两位小数的字符串（整列运算，不逐个调用 format），NaN 为空"""
+    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float)
+    missing = np.isnan(values)
+    text = pd.Series(np.char.mod('%.2f', np.abs(np.where(missing, 0.0, values))), index=series.index)
+    text = text.str.replace(r'(\d)(?=(\d{3})+\.)', r'\1,', regex=True)
+    text = text.where(values >= 0, '-' + text)
+    return text.where(~missing, '')
+
+def _escape(series):
+    return (series.astype(str)
+            .str.replace('&', '&amp;', regex=False)
+            .str.replace('<', '&lt;', regex=False)
+            .str.replace('>', '&gt;', regex=False))
+
+def create_html_table(df, max_rows=MAX_HTML_ROWS):
     """
-    
-    # 格式化数字列（添加千位分隔符和两位小数）
-    for col in ['北京', '上海', '总计']:
-        df[col] = df[col].apply(lambda x: f"{x:,.2f}")
-    
-    # 转换为HTML表格
-    html_table = df.to_html(index=False, classes='sales-table')
-    
-    # 添加样式
-    html_content = f"{html_style}\n{html_table}"
-    
-    return html_content
+    将DataFrame转换为HTML表格
 
-def send_email(recipient, subject, html_content, attachment_path=None):
-    """发送HTML格式邮件"""
-    # 加载环境变量
-    dotenv.load_dotenv()
-    
-    # 获取邮箱配置
-    sender = os.getenv('EMAIL_USER')
-    password = os.getenv('EMAIL_PASSWORD')
-    
-    if not sender or not password:
+    数值列整列格式化（千位分隔符、两位小数），不修改传入的 DataFrame；
+    行数超过 max_rows 时只显示前 max_rows 行（保留末尾的总计行），并提示查看附件
+
+    参数:
+        df (DataFrame): 汇总数据
+        max_rows (int): 最多显示的行数，None 表示全部显示
+
+    返回:
+        str: 包含样式的 HTML
+    """
+    total_rows = len(df)
+    shown = df
+    if max_rows is not None and total_rows > max_rows:
+        shown = df.iloc[:max_rows]
+        # 总计行放在最后时一并保留
+        if str(df.iloc[-1, 0]) == '总计':
+            shown = pd.concat([shown, df.iloc[[-1]]])
+
+    header = ''.join(f'<th>{_escape(pd.Series([col])).iloc[0]}</th>' for col in shown.columns)
+
+    rows = pd.Series('', index=shown.index)
+    for col in shown.columns:
+        if pd.api.types.is_numeric_dtype(shown[col]):
+            rows = rows + '<td>' + format_amounts(shown[col]) + '</td>'
+        else:
+            rows = rows + '<td>' + _escape(shown[col].fillna('')) + '</td>'
+    is_total = shown.iloc[:, 0].astype(str).eq('总计') if len(shown.columns) else pd.Series(False, index=shown.index)
+    rows = np.where(is_total, '<tr class="total-row">', '<tr>') + rows + '</tr>'
+
+    html_table = (f'<table class="sales-table"><thead><tr>{header}</tr></thead>'
+                  f'<tbody>{"".join(rows)}</tbody></table>')
+
+    note = ''
+    if len(shown) < total_rows:
+        note = (f'<p class="table-note">仅显示前 {max_rows} 行（共 {total_rows} 行），'
+                f'完整数据请查看附件。</p>')
+
+    return f"{HTML_STYLE}\n{html_table}{note}"
+
+def load_email_config(reload=False):
+    """读取邮箱配置，.env 只在第一次调用时加载"""
+    global _email_config
+    if _email_config is None or reload:
+        # 加载环境变量
+        dotenv.load_dotenv()
+        _email_config = {
+            'sender': os.getenv('EMAIL_USER'),
+            'password': os.getenv('EMAIL_PASSWORD'),
+            'host': os.getenv('EMAIL_HOST', DEFAULT_HOST),
+            'port': int(os.getenv('EMAIL_PORT', DEFAULT_PORT)),
+            'use_ssl': os.getenv('EMAIL_SSL', '1') not in ('0', 'false', 'False'),
+        }
+    return _email_config
+
+def _check_config(config):
+    # 不加密的连接只用于本地中转或测试服务器，可以不登录
+    if not config['sender'] or (config['use_ssl'] and not config['password']):
         print("错误：未设置邮箱环境变量，请设置EMAIL_USER和EMAIL_PASSWORD")
         return False
-    
+    return True
+
+def _connect(config, timeout=30):
+    """建立SMTP连接并登录"""
+    if config['use_ssl']:
+        server = smtplib.SMTP_SSL(config['host'], config['port'], timeout=timeout)
+    else:
+        server = smtplib.SMTP(config['host'], config['port'], timeout=timeout)
+    if config['password']:
+        server.login(config['sender'], config['password'])
+    return server
+
+def build_attachment(attachment_path):
+    """读取附件并完成 base64 编码，返回的对象可以附加到多封邮件中"""
+    if not attachment_path or not os.path.exists(attachment_path):
+        return None
+    with open(attachment_path, 'rb') as f:
+        attachment = MIMEApplication(f.read())
+    attachment.add_header('Content-Disposition', 'attachment',
+                          filename=os.path.basename(attachment_path))
+    return attachment
+
+def build_message(sender, recipient, subject, html_part, attachment=None):
+    """组装一封邮件，html_part 和 attachment 是已经编码好的 MIME 对象"""
+    # 创建邮件对象
+    msg = MIMEMultipart()
+    msg['From'] = sender
+    msg['To'] = recipient
+    msg['Subject'] = subject
+    msg.attach(html_part)
+    if attachment is not None:
+        msg.attach(attachment)
+    return msg
+
+def _send_group(config, recipients, subject, html_part, attachment):
+    """用一个连接依次发送一组邮件，返回 {收件人: 错误信息或 None}"""
+    results = {}
     try:
-        # 创建邮件对象
-        msg = MIMEMultipart()
-        msg['From'] = sender
-        msg['To'] = recipient
-        msg['Subject'] = subject
-        
-        # 添加HTML内容
-        msg.attach(MIMEText(html_content, 'html', 'utf-8'))
-        
-        # 添加附件
-        if attachment_path and os.path.exists(attachment_path):
-            with open(attachment_path, 'rb') as f:
-                attachment = MIMEApplication(f.read())
-                attachment.add_header('Content-Disposition', 'attachment', 
-                                    filename=os.path.basename(attachment_path))
-                msg.attach(attachment)
-        
-        # 连接QQ邮箱SMTP服务器
-        server = smtplib.SMTP_SSL('smtp.qq.com', 465)
-        server.login(sender, password)
-        
-        # 发送邮件
-        server.send_message(msg)
-        server.quit()
-        
+        server = _connect(config)
+    except Exception as e:
+        return {recipient: f"连接或登录失败: {e}" for recipient in recipients}
+
+    try:
+        for recipient in recipients:
+            try:
+                server.send_message(build_message(config['sender'], recipient, subject, html_part, attachment))
+                results[recipient] = None
+            except smtplib.SMTPServerDisconnected as e:
+                # 连接被服务器断开，重连一次后继续发送剩余的邮件；只有重连失败时才放弃剩余的收件人
+                try:
+                    server = _connect(config)
+                except Exception as connect_error:
+                    results[recipient] = f"{e}; 重连失败: {connect_error}"
+                    break
+                try:
+                    server.send_message(build_message(config['sender'], recipient, subject, html_part, attachment))
+                    results[recipient] = None
+                except Exception as resend_error:
+                    results[recipient] = f"{e}; 重新发送失败: {resend_error}"
+            except Exception as e:
+                results[recipient] = str(e)
+    finally:
+        try:
+            server.quit()
+        except Exception:
+            pass
+
+    for recipient in recipients:
+        results.setdefault(recipient, "连接中断，未发送")
+    return results
+
+def send_batch(recipients, subject, html_content, attachment_path=None, per_connection=50, workers=4):
+    """
+    批量发送HTML格式邮件
+
+    每个连接登录一次后连续发送 per_connection 封邮件，附件只读取和编码一次，
+    最多 workers 个连接并发发送
+
+    参数:
+        recipients (list): 收件人邮箱列表
+        subject (str): 邮件主题
+        html_content (str): HTML 正文
+        attachment_path (str): 附件路径
+        per_connection (int): 每个连接发送的邮件数
+        workers (int): 并发连接数
+
+    返回:
+        dict: {收件人: 错误信息}，发送成功时为 None
+    """
+    config = load_email_config()
+    if not _check_config(config):
+        return {recipient: "未设置邮箱环境变量" for recipient in recipients}
+
+    # 正文和附件只编码一次，所有邮件共用
+    html_part = MIMEText(html_content, 'html', 'utf-8')
+    attachment = build_attachment(attachment_path)
+
+    groups = [recipients[i:i + per_connection] for i in range(0, len(recipients), per_connection)]
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(groups)))) as executor:
+        for group_results in executor.map(
+                lambda group: _send_group(config, group, subject, html_part, attachment), groups):
+            results.update(group_results)
+    return results
+
+def send_email(recipient, subject, html_content, attachment_path=None):
+    """发送HTML格式邮件"""
+    error = send_batch([recipient], subject, html_content, attachment_path)[recipient]
+    if error is None:
         print(f"邮件已成功发送至 {recipient}")
         return True
-        
-    except Exception as e:
-        print(f"发送邮件时出错: {e}")
-        return False
+    print(f"发送邮件时出错: {error}")
+    return False
 
 def main():
     # 加载销售数据
@@ -126,11 +254,19 @@ def main():
     """
     
     # 发送邮件
-    recipient = input("请输入收件人邮箱: ")
+    recipients = [r.strip() for r in input("请输入收件人邮箱（多个用逗号分隔）: ").split(',') if r.strip()]
     subject = f"销售数据汇总报告 ({today})"
     attachment_path = 'sales_汇总.xlsx'
-    
-    send_email(recipient, subject, html_content, attachment_path)
+
+    if len(recipients) == 1:
+        send_email(recipients[0], subject, html_content, attachment_path)
+        return
+
+    results = send_batch(recipients, subject, html_content, attachment_path)
+    failed = {recipient: error for recipient, error in results.items() if error is not None}
+    print(f"邮件已发送 {len(results) - len(failed)}/{len(results)} 封")
+    for recipient, error in failed.items():
+        print(f"发送至 {recipient} 失败: {error}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
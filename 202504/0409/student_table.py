@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+列式存储的学生成绩数据。
+
+姓名和成绩各保存为一个数组，成绩等级用 np.searchsorted 一次算出，不再逐行 iterrows。
+{姓名: 成绩} 字典、[{'姓名', '成绩'}] 列表和按等级分组的名单只在第一次被访问时生成，
+只做统计的调用方不会为几百万名学生创建 Python 对象。
+
+需要反复查询前 N 名或某个等级的学生时，调用 build_indexes() 一次建好按成绩排序的下标
+和每个等级的下标数组，之后每次查询只取出需要的 k 条记录，是 O(k)。
+"""
+
+import collections
+from collections.abc import Mapping
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+# 成绩等级定义（闭区间）
+GRADE_LEVELS = {
+    '优秀': (90, 100),
+    '良好': (80, 89),
+    '中等': (70, 79),
+    '及格': (60, 69),
+    '不及格': (0, 59)
+}
+UNKNOWN_LEVEL = '未知'
+
+
+def grade_level_codes(grades, grade_levels=GRADE_LEVELS):
+    """
+    计算每个成绩所属等级在 grade_levels 中的序号
+
+    与逐个判断 min_grade <= grade <= max_grade 的结果相同：先按区间下界二分查找，
+    再检查是否超过该区间的上界，落在区间之间（如 89.5）或范围之外的成绩为 -1
+
+    参数:
+        grades (array-like): 成绩
+        grade_levels (dict): 等级名 → (最低分, 最高分)
+
+    返回:
+        ndarray: 等级序号，-1 表示未知
+    """
+    grades = np.asarray(grades, dtype=float)
+    bounds = np.array(list(grade_levels.values()), dtype=float)
+    order = np.argsort(bounds[:, 0], kind='stable')
+    lows, highs = bounds[order, 0], bounds[order, 1]
+
+    position = np.searchsorted(lows, grades, side='right') - 1
+    clipped = np.clip(position, 0, None)
+    valid = (position >= 0) & (grades <= highs[clipped])
+    return np.where(valid, order[clipped], -1)
+
+
+class StudentTable(Mapping):
+    """学生成绩表，按 {姓名: 成绩} 的只读映射使用时才生成字典"""
+
+    def __init__(self, names, grades, grade_levels=GRADE_LEVELS):
+        self.names = np.asarray(names, dtype=object)
+        self.grades = np.asarray(grades)
+        self.grade_levels = grade_levels
+        self.level_names = list(grade_levels) + [UNKNOWN_LEVEL]
+
+    @classmethod
+    def from_frame(cls, df, grade_levels=GRADE_LEVELS):
+        return cls(df['姓名'].to_numpy(dtype=object), df['成绩'].to_numpy(), grade_levels)
+
+    @cached_property
+    def level_codes(self):
+        """每名学生的等级序号，未知等级为 len(grade_levels)"""
+        codes = grade_level_codes(self.grades, self.grade_levels)
+        return np.where(codes < 0, len(self.grade_levels), codes)
+
+    @property
+    def levels(self):
+        """每名学生的等级名（数组）"""
+        return np.array(self.level_names, dtype=object)[self.level_codes]
+
+    def level_counts(self):
+        """各等级人数（按 grade_levels 的顺序，不含未知）"""
+        counts = np.bincount(self.level_codes, minlength=len(self.level_names))
+        return {level: int(count) for level, count in zip(self.grade_levels, counts)}
+
+    @cached_property
+    def _latest_mask(self):
+        # 重名时与字典一致，只保留最后一条
+        return ~pd.Series(self.names).duplicated(keep='last').to_numpy()
+
+    @cached_property
+    def _name_codes(self):
+        # 按姓名第一次出现的顺序编号，与字典键的顺序一致
+        return pd.factorize(self.names)[0]
+
+    @cached_property
+    def unique_positions(self):
+        """students_dict 中每名学生对应的行号（按字典顺序，重名取最后一行）"""
+        if self._latest_mask.all():
+            return np.arange(len(self.names))
+        latest = np.flatnonzero(self._latest_mask)
+        positions = np.empty(len(latest), dtype=np.intp)
+        positions[self._name_codes[latest]] = latest
+        return positions
+
+    @cached_property
+    def _row_to_latest(self):
+        # 每一行对应的同名学生最后一行，用来取字典中的成绩
+        return self.unique_positions[self._name_codes]
+
+    @cached_property
+    def ranking(self):
+        """按成绩从高到低排列的行号，成绩相同时保持字典顺序（与 sorted 的稳定排序一致）"""
+        positions = self.unique_positions
+        return positions[np.argsort(-self.grades[positions], kind='stable')]
+
+    @cached_property
+    def level_positions(self):
+        """{等级: 行号数组}，每个等级内保持文件中的顺序，包含未知等级"""
+        order = np.argsort(self.level_codes, kind='stable')
+        boundaries = np.searchsorted(self.level_codes[order], np.arange(len(self.level_names) + 1))
+        return {level: order[boundaries[code]:boundaries[code + 1]]
+                for code, level in enumerate(self.level_names)}
+
+    def build_indexes(self):
+        """预先建立排名和等级索引，之后的 top / students_in_level 查询都是 O(k)"""
+        self.ranking
+        self.level_positions
+        if not self._latest_mask.all():
+            self._row_to_latest
+        return self
+
+    def top_positions(self, n):
+        """
+        成绩最高的 n 名学生的行号
+
+        已建立排名索引时直接取前 n 个；否则用 np.partition 找出第 n 高的成绩，
+        只对不低于它的候选者排序，整体 O(len + c log c)，c 为候选人数
+
+        参数:
+            n (int): 学生数量
+
+        返回:
+            ndarray: 行号，按成绩从高到低排列
+        """
+        if 'ranking' in self.__dict__:
+            return self.ranking[:max(n, 0)]
+        positions = self.unique_positions
+        count = len(positions)
+        if n <= 0:
+            return positions[:0]
+        if n >= count:
+            return self.ranking
+        grades = self.grades[positions]
+        threshold = np.partition(grades, count - n)[count - n]
+        candidates = np.flatnonzero(grades >= threshold)
+        order = candidates[np.argsort(-grades[candidates], kind='stable')]
+        return positions[order[:n]]
+
+    def top(self, n):
+        """成绩最高的 n 名学生，格式为 [{'姓名', '成绩', '排名'}]，与按字典排序的结果相同"""
+        positions = self.top_positions(n)
+        return [{'姓名': name, '成绩': grade, '排名': i + 1}
+                for i, (name, grade) in enumerate(zip(self.names[positions].tolist(),
+                                                      self.grades[positions].tolist()))]
+
+    def students_in_level(self, level):
+        """指定等级的学生，格式为 [{'姓名', '成绩'}]；重名学生的成绩与字典一致，取最后一条"""
+        rows = self.level_positions.get(level)
+        if rows is None or len(rows) == 0:
+            return []
+        grade_rows = rows if self._latest_mask.all() else self._row_to_latest[rows]
+        return [{'姓名': name, '成绩': grade}
+                for name, grade in zip(self.names[rows].tolist(), self.grades[grade_rows].tolist())]
+
+    @property
+    def latest_grades(self):
+        """与 students_dict.values() 相同的成绩（重名只保留最后一条），不生成字典"""
+        mask = self._latest_mask
+        return self.grades if mask.all() else self.grades[mask]
+
+    @cached_property
+    def students_dict(self):
+        """{学生姓名: 成绩}，重名时保留最后一条"""
+        return dict(zip(self.names.tolist(), self.grades.tolist()))
+
+    @cached_property
+    def students_list(self):
+        """[{'姓名': 姓名, '成绩': 成绩}, ...]，保持文件中的顺序"""
+        return [{'姓名': name, '成绩': grade} for name, grade in zip(self.names.tolist(), self.grades.tolist())]
+
+    @cached_property
+    def grades_by_level(self):
+        """{等级: [姓名, ...]}，每个等级内保持文件中的顺序"""
+        by_level = collections.defaultdict(list)
+        for level, rows in self.level_positions.items():
+            if len(rows):
+                by_level[level] = self.names[rows].tolist()
+        return by_level
+
+    def __len__(self):
+        return int(self._latest_mask.sum())
+
+    def __iter__(self):
+        return iter(self.students_dict)
+
+    def __getitem__(self, name):
+        return self.students_dict[name]
+
+    def __repr__(self):
+        return f"StudentTable({len(self.names)} 行)"
+
+
+def read_student_table(filename, grade_levels=GRADE_LEVELS):
+    """
+    读取学生成绩 CSV 文件
+
+    返回:
+        tuple: (StudentTable, DataFrame)
+    """
+    df = pd.read_csv(filename, encoding='utf-8-sig')
+    return StudentTable.from_frame(df, grade_levels), df
@@ -0,0 +1,415 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+成绩统计计算。
+
+本文件是 202504/0409/grade_stats.py 的副本，使本目录的脚本可以单独运行；修改时两处保持一致。
+
+原来的脚本对同一份成绩分别调用 statistics.mean / median / stdev / variance / quantiles，
+每次都重新扫描或重新排序整个列表。summarize 用一次求和与平方和得到均值和方差，
+再用一次 np.partition 同时得到最小值、最大值、中位数和所有需要的分位数，整体是 O(n)，
+只复制一次数组。
+
+分位数与 statistics 模块保持一致：中位数按 statistics.median（线性插值），
+其余分位数按 statistics.quantiles 默认的 exclusive 方法计算。
+整数成绩的均值、方差和标准差用整数运算后正确舍入，与 statistics 模块逐位相同；
+浮点成绩（以及由浮点数插值得到的分位数）与 statistics 模块只在显示精度内一致，
+最后几位可能不同。
+
+文件太大无法一次读入时，用 OnlineGradeStats 逐块累计：Welford 均值/方差、最值和
+每个整数分数的人数直方图。整数成绩的结果由直方图精确得出，与 summarize 完全相同。
+直方图的大小有上限（MAX_HISTOGRAM_SPAN / MAX_HISTOGRAM_SCORES），内存与文件行数无关。
+"""
+
+import csv
+import itertools
+import math
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+def _positions(n, q, method):
+    """返回分位数 q 对应的 (下标, 上标, 权重)，结果为 data[lo] + (data[hi] - data[lo]) * weight"""
+    if n == 1:
+        return 0, 0, 0.0
+    if method == 'exclusive':
+        # 与 statistics.quantiles(method='exclusive') 相同，两端按最近两个值外推
+        pos = q * (n + 1) - 1
+        lo = min(max(math.floor(pos), 0), n - 2)
+    elif method == 'linear':
+        pos = q * (n - 1)
+        lo = min(math.floor(pos), n - 2)
+    else:
+        raise ValueError(f"不支持的分位数方法: {method}")
+    return lo, lo + 1, pos - lo
+
+
+def _empty_summary(percentiles, at_least):
+    nan = float('nan')
+    return {'count': 0, 'total': 0, 'mean': nan, 'variance': nan, 'std_dev': nan,
+            'min': nan, 'max': nan, 'median': nan,
+            'percentiles': {p: nan for p in percentiles}, 'at_least': {t: 0 for t in at_least}}
+
+
+# 与 statistics 模块相同：整数平方根的位数多于两个 float 尾数，保证舍入正确
+_SQRT_BIT_WIDTH = 2 * sys.float_info.mant_dig + 3
+
+
+def _sqrt_of_fraction(numerator, denominator):
+    """numerator / denominator 的平方根，正确舍入为 float（与 statistics.stdev 的算法相同）"""
+    shift = (numerator.bit_length() - denominator.bit_length() - _SQRT_BIT_WIDTH) // 2
+    if shift >= 0:
+        root = _isqrt_round_to_odd(numerator, denominator << 2 * shift) << shift
+        return root / 1
+    return _isqrt_round_to_odd(numerator << -2 * shift, denominator) / (1 << -shift)
+
+
+def _isqrt_round_to_odd(numerator, denominator):
+    root = math.isqrt(numerator // denominator)
+    return root | (root * root * denominator != numerator)
+
+
+# 个数乘以最大绝对值的平方小于该值时，int64 的和与平方和不会溢出
+_INT64_LIMIT = 2 ** 63
+
+
+def _integer_sums(values, counts=None):
+    """
+    整数成绩的和与平方和（Python 整数）
+
+    参数:
+        values (ndarray): int64 成绩或分数
+        counts (ndarray): 每个分数的人数，为 None 时每个值计一次
+
+    返回:
+        tuple: (和, 平方和)；可能超出 int64 范围时（如几十亿的异常值）改用 Python 整数逐项计算
+    """
+    n = values.size if counts is None else int(counts.sum())
+    bound = max(abs(int(values.min())), abs(int(values.max())))
+    if bound * bound * n >= _INT64_LIMIT:
+        values = values.astype(object)
+        counts = None if counts is None else counts.astype(object)
+    if counts is None:
+        return int(values.sum()), int(np.dot(values, values))
+    return int(np.dot(values, counts)), int(np.dot(values * values, counts))
+
+
+def _integer_moments(n, total, square_total):
+    """整数成绩的均值、样本方差和标准差（整数运算后正确舍入，与 statistics 模块逐位相同）"""
+    mean = total / n
+    if n < 2:
+        return mean, 0, 0.0
+    numerator, denominator = n * square_total - total * total, n * (n - 1)
+    return mean, numerator / denominator, _sqrt_of_fraction(numerator, denominator)
+
+
+def _order_statistics(n, order_stat, percentiles, method):
+    """
+    根据第 k 小的值计算中位数和百分位数
+
+    参数:
+        n (int): 数据个数
+        order_stat (callable): 接收下标列表，返回 {下标: 第 k 小的值}
+    """
+    wanted = {'median': _positions(n, 0.5, 'linear')}
+    for p in percentiles:
+        wanted[p] = _positions(n, p / 100, method)
+    values = order_stat(sorted({0, n - 1} | {i for lo, hi, _ in wanted.values() for i in (lo, hi)}))
+
+    def value_at(position):
+        lo, hi, weight = position
+        low, high = values[lo], values[hi]
+        if weight == 0:
+            return low
+        return low + (high - low) * weight
+
+    return values[0], values[n - 1], value_at(wanted['median']), {p: value_at(wanted[p]) for p in percentiles}
+
+
+def summarize(values, percentiles=(25, 75), method='exclusive', at_least=(60,)):
+    """
+    一次计算成绩的全部统计量
+
+    参数:
+        values (array-like): 成绩
+        percentiles (tuple): 需要的百分位数（0-100）
+        method (str): 百分位数的计算方法，exclusive（同 statistics.quantiles）或 linear（同 numpy / pandas）
+        at_least (tuple): 需要统计“不低于该分数”人数的分数线
+
+    返回:
+        dict: count / total / mean / variance / std_dev（样本方差和标准差）/ min / max / median /
+            percentiles（{百分位: 值}）/ at_least（{分数线: 人数}）
+    """
+    data = np.asarray(values)
+    if data.dtype.kind not in 'iuf':
+        data = data.astype(float)
+    n = data.size
+    if n == 0:
+        return _empty_summary(percentiles, at_least)
+
+    # 一次求和、一次平方和；整数成绩用整数运算，结果与 statistics 模块逐位相同
+    if data.dtype.kind in 'iu':
+        data = data.astype(np.int64, copy=False)
+        total, square_total = _integer_sums(data)
+        mean, variance, std_dev = _integer_moments(n, total, square_total)
+    else:
+        total = float(data.sum())
+        square_total = float(np.dot(data, data))
+        mean = total / n
+        variance = max(0.0, (square_total - total * mean) / (n - 1)) if n > 1 else 0
+        std_dev = math.sqrt(variance)
+
+    # 一次 partition 得到所有需要的顺序统计量
+    def order_stat(kth):
+        partitioned = np.partition(data, kth)
+        return {k: partitioned[k].item() for k in kth}
+
+    minimum, maximum, median, quantiles = _order_statistics(n, order_stat, percentiles, method)
+    return {
+        'count': n,
+        'total': total,
+        'mean': mean,
+        'variance': variance,
+        'std_dev': std_dev,
+        'min': minimum,
+        'max': maximum,
+        'median': median,
+        'percentiles': quantiles,
+        'at_least': {t: int(np.count_nonzero(data >= t)) for t in at_least},
+    }
+
+
+class OnlineGradeStats:
+    """逐块累计的成绩统计，内存占用与数据量无关"""
+
+    # 分数范围不超过该值时用连续数组计数，否则改为只保存出现过的分数
+    MAX_HISTOGRAM_SPAN = 100000
+    # 出现过的不同分数超过该值时不再维护直方图，只保留 Welford 统计
+    MAX_HISTOGRAM_SCORES = 1000000
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # 与均值之差的平方和（Welford）
+        self.min = None
+        self.max = None
+        # histogram[i] 为分数 offset + i 的人数（稀疏时为 scores[i] 的人数）；
+        # 出现非整数成绩或不同分数过多后为 None
+        self.offset = None
+        self.scores = None
+        self.histogram = np.zeros(0, dtype=np.int64)
+        self.integer = True
+
+    def update(self, values):
+        """累计一块成绩"""
+        data = np.asarray(values)
+        if data.size == 0:
+            return
+        if data.dtype.kind == 'f' and self.integer and np.array_equal(data, np.floor(data)):
+            data = data.astype(np.int64)
+        if data.dtype.kind not in 'iu':
+            data = data.astype(float)
+            self.integer = False
+            self.histogram = None
+
+        # 分块合并的 Welford 算法（Chan 等人的并行形式）
+        n_b = data.size
+        mean_b = float(data.mean())
+        m2_b = float(np.square(data - mean_b).sum())
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * self.count * n_b / n
+        self.count = n
+
+        chunk_min, chunk_max = data.min().item(), data.max().item()
+        self.min = chunk_min if self.min is None else min(self.min, chunk_min)
+        self.max = chunk_max if self.max is None else max(self.max, chunk_max)
+
+        if self.integer:
+            # 块内的和可能超出 int64 时逐项用 Python 整数相加
+            bound = max(abs(chunk_min), abs(chunk_max))
+            self.total += int(data.sum()) if bound * n_b < _INT64_LIMIT else sum(data.tolist())
+        else:
+            self.total = float(self.total) + float(data.sum())
+        if self.histogram is not None:
+            self._add_to_histogram(data, chunk_min, chunk_max)
+
+    def _add_to_histogram(self, data, chunk_min, chunk_max):
+        if self.scores is None:
+            if self.offset is None:
+                self.offset = chunk_min
+            low = min(self.offset, chunk_min)
+            high = max(self.offset + len(self.histogram) - 1, chunk_max)
+            if high - low < self.MAX_HISTOGRAM_SPAN:
+                if low < self.offset or high >= self.offset + len(self.histogram):
+                    grown = np.zeros(high - low + 1, dtype=np.int64)
+                    grown[self.offset - low:self.offset - low + len(self.histogram)] = self.histogram
+                    self.histogram, self.offset = grown, low
+                counts = np.bincount(data - chunk_min)
+                start = chunk_min - self.offset
+                self.histogram[start:start + len(counts)] += counts
+                return
+            # 个别异常值会让连续数组变得很大，改为只保存出现过的分数
+            nonzero = np.flatnonzero(self.histogram)
+            self.scores, self.histogram = self.offset + nonzero, self.histogram[nonzero]
+
+        chunk_scores, chunk_counts = np.unique(data, return_counts=True)
+        scores, inverse = np.unique(np.concatenate([self.scores, chunk_scores]), return_inverse=True)
+        if len(scores) > self.MAX_HISTOGRAM_SCORES:
+            self.scores = self.histogram = None
+            return
+        counts = np.zeros(len(scores), dtype=np.int64)
+        np.add.at(counts, inverse, np.concatenate([self.histogram, chunk_counts]))
+        self.scores, self.histogram = scores, counts
+
+    def summary(self, percentiles=(25, 75), method='exclusive', at_least=(60,)):
+        """
+        返回与 summarize 相同格式的统计结果
+
+        整数成绩的所有结果都由直方图精确计算；出现过非整数成绩或不同分数超过 MAX_HISTOGRAM_SCORES 时
+        均值和方差来自 Welford 累计，中位数、百分位数和分数线人数无法精确得到，返回 None
+        """
+        n = self.count
+        if n == 0:
+            return _empty_summary(percentiles, at_least)
+
+        if self.histogram is None:
+            variance = self.m2 / (n - 1) if n > 1 else 0
+            return {
+                'count': n, 'total': self.total, 'mean': self.mean,
+                'variance': variance, 'std_dev': math.sqrt(variance),
+                'min': self.min, 'max': self.max, 'median': None,
+                'percentiles': {p: None for p in percentiles},
+                'at_least': {t: None for t in at_least},
+            }
+
+        scores = self.scores
+        if scores is None:
+            scores = np.arange(self.offset, self.offset + len(self.histogram), dtype=np.int64)
+        return summarize_histogram(scores, self.histogram, percentiles, method, at_least)
+
+
+def summarize_histogram(scores, counts, percentiles=(25, 75), method='exclusive', at_least=(60,)):
+    """
+    由 {分数: 人数} 直方图计算统计量，结果与对展开后的成绩调用 summarize 相同
+
+    参数:
+        scores (array-like): 从小到大排列、互不相同的分数
+        counts (array-like): 每个分数的人数
+        其余参数同 summarize
+
+    返回:
+        dict: 与 summarize 相同格式的统计结果
+    """
+    scores = np.asarray(scores)
+    counts = np.asarray(counts, dtype=np.int64)
+    n = int(counts.sum())
+    if n == 0:
+        return _empty_summary(percentiles, at_least)
+
+    if scores.dtype.kind in 'iu':
+        scores = scores.astype(np.int64, copy=False)
+        total, square_total = _integer_sums(scores, counts)
+        mean, variance, std_dev = _integer_moments(n, total, square_total)
+    else:
+        scores = scores.astype(float, copy=False)
+        total = float(np.dot(scores, counts))
+        square_total = float(np.dot(scores * scores, counts))
+        mean = total / n
+        variance = max(0.0, (square_total - total * mean) / (n - 1)) if n > 1 else 0
+        std_dev = math.sqrt(variance)
+
+    cumulative = np.cumsum(counts)
+
+    def order_stat(kth):
+        index = np.searchsorted(cumulative, np.asarray(kth) + 1)
+        return {k: scores[i].item() for k, i in zip(kth, index)}
+
+    minimum, maximum, median, quantiles = _order_statistics(n, order_stat, percentiles, method)
+    return {
+        'count': n,
+        'total': total,
+        'mean': mean,
+        'variance': variance,
+        'std_dev': std_dev,
+        'min': minimum,
+        'max': maximum,
+        'median': median,
+        'percentiles': quantiles,
+        'at_least': {t: int(counts[scores >= t].sum()) for t in at_least},
+    }
+
+
+def parse_int_grades(text):
+    """
+    按 int() 的规则把字符串成绩转换为整数数组
+
+    普通的十进制整数整列转换；其余写法（下划线分隔、全角数字等）逐个交给 int()，
+    无法转换的值（如 '89.0'、空字符串）抛出与 int() 相同的 ValueError
+
+    参数:
+        text (Series): 字符串成绩
+
+    返回:
+        ndarray: int64 成绩
+    """
+    text = text.to_numpy(dtype=object)
+    plain = pd.Series(text).str.fullmatch(r'\s*[+-]?[0-9]{1,18}\s*').to_numpy(dtype=bool)
+    values = np.empty(len(text), dtype=np.int64)
+    values[plain] = pd.Series(text[plain]).str.strip().astype(np.int64).to_numpy()
+    if not plain.all():
+        values[~plain] = [int(value) for value in text[~plain]]
+    return values
+
+
+def _iter_csv_column(filename, column, chunk_size):
+    """
+    用 csv.reader 逐块读取一列字符串，与逐行读取的脚本相同：跳过表头，缺少该字段的行不计入
+
+    返回:
+        generator: 每块一个字符串 Series
+    """
+    with open(filename, 'r', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        index = column if isinstance(column, int) else header.index(column)
+        while True:
+            rows = list(itertools.islice(reader, chunk_size))
+            if not rows:
+                return
+            yield pd.Series([row[index] for row in rows if len(row) > index], dtype=object)
+
+
+def summarize_csv(filename, column=1, chunk_size=100000, integer_only=False, **kwargs):
+    """
+    分块读取成绩 CSV 文件并累计统计，内存占用与文件大小无关
+
+    参数:
+        filename (str): CSV 文件名（第一行为表头）
+        column (int | str): 成绩所在的列（序号或列名）
+        chunk_size (int): 每块的行数
+        integer_only (bool): 用 csv.reader 读取并按 int(成绩) 的规则解析，与逐行读取的脚本结果相同：
+            缺少成绩字段的行跳过，'89.0'、空成绩等无法转换的值抛出 ValueError
+        **kwargs: 传给 OnlineGradeStats.summary 的参数
+
+    返回:
+        dict: 与 summarize 相同格式的统计结果
+    """
+    online = OnlineGradeStats()
+    if integer_only:
+        # pandas 不区分空成绩和缺少成绩字段的行，这里与逐行 int(row[1]) 的脚本一样分别处理
+        for grades in _iter_csv_column(filename, column, chunk_size):
+            online.update(parse_int_grades(grades))
+        return online.summary(**kwargs)
+
+    for chunk in pd.read_csv(filename, encoding='utf-8-sig', usecols=[column], chunksize=chunk_size):
+        # 成绩为空的行跳过；非数字成绩抛出 ValueError
+        online.update(pd.to_numeric(chunk.iloc[:, 0].dropna(), errors='raise').to_numpy())
+    return online.summary(**kwargs)
@@ -11,6 +11,8 @@ import random
 import matplotlib.pyplot as plt
 from typing import List, Dict, Any
 
+from grade_stats import summarize
+
 
 def generate_sample_data(num_students: int = 10, min_score: int = 60, max_score: int = 100) -> pd.DataFrame:
     """
@@ -52,14 +54,17 @@ def calculate_statistics(df: pd.DataFrame) -> Dict[str, Any]:
     返回:
         Dict[str, Any]: 统计信息
     """
+    summary = summarize(df['分数'].to_numpy(), percentiles=(), at_least=(60, 90))
+    count = summary['count']
+    
     stats = {
-        '平均分': df['分数'].mean(),
-        '最高分': df['分数'].max(),
-        '最低分': df['分数'].min(),
-        '中位数': df['分数'].median(),
-        '标准差': df['分数'].std(),
-        '及格率': (df['分数'] >= 60).mean() * 100,
-        '优秀率': (df['分数'] >= 90).mean() * 100
+        '平均分': summary['mean'],
+        '最高分': summary['max'],
+        '最低分': summary['min'],
+        '中位数': summary['median'],
+        '标准差': summary['std_dev'] if count > 1 else float('nan'),
+        '及格率': summary['at_least'][60] / count * 100 if count else float('nan'),
+        '优秀率': summary['at_least'][90] / count * 100 if count else float('nan')
     }
     
     return stats